@@ -19,6 +19,7 @@ if src_path not in sys.path:
 from src.utils import init_logging, handle_errors, is_running_in_snowflake_env
 from src.ui_elements import UIElements
 from src.data_fetcher import DataFetcher
+from src.chart_builder import ChartBuilder
 # Import specific page render functions
 from src.pages.user_360_page import User360Page
 
@@ -97,9 +98,11 @@ def main():
     # Inject global CSS styles
     UIElements.render_global_styles()
 
-    # Load all SQL queries once at startup
+    # Serialize charts with orjson when it's available
+    ChartBuilder.configure_json_engine()
+
+    # Index the SQL query files; each one is loaded the first time one of its queries is used
     DataFetcher.set_queries_base_dir(os.path.join(current_dir, "queries"))
-    DataFetcher.load_all_queries()
 
     st.sidebar.title("FinOps Dashboard")
     st.sidebar.markdown("---")
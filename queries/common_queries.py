@@ -5,11 +5,20 @@
 # Use f-strings or .format() if you need dynamic table names,
 # but for most cases, stick to placeholders like {start_date} for QueryManager.
 
+from types import MappingProxyType
+
 COMMON_SQL_QUERIES = {
-    "get_distinct_users_30_days": """
-        SELECT DISTINCT user_name
-        FROM {query_history_table}
-        WHERE start_time >= CURRENT_DATE - 30
-        ORDER BY user_name;
+    # Reads the small USERS dimension rather than a DISTINCT over the whole query history
+    "get_all_users": """
+        SELECT DISTINCT name AS user_name
+        FROM {users_table}
+        WHERE deleted_on IS NULL
+        ORDER BY name;
     """
-}
\ No newline at end of file
+}
+
+# Read-only from here on: the loaded queries are shared by every Streamlit session.
+COMMON_SQL_QUERIES = MappingProxyType(COMMON_SQL_QUERIES)
+
+# The name DataFetcher's loader reads from every query file
+SQL_QUERIES = COMMON_SQL_QUERIES
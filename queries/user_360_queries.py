@@ -1,65 +1,98 @@
 # finops_dashboard/queries/user_360_queries.py
 
+from types import MappingProxyType
 from typing import Dict
 
+# Credits per hour for each warehouse size, evaluated inline by Snowflake.
+# A DECODE over the size column replaces the join against a VALUES lookup CTE
+# that every cost query used to build; it is spliced into the queries below
+# wherever '{credits_per_hour}' appears.
+_CREDITS_PER_HOUR_EXPR = (
+    "DECODE(UPPER(qh.warehouse_size), "
+    "'X-SMALL', 1, 'SMALL', 2, 'MEDIUM', 4, 'LARGE', 8, 'X-LARGE', 16, "
+    "'2X-LARGE', 32, '3X-LARGE', 64, '4X-LARGE', 128, '5X-LARGE', 256, '6X-LARGE', 512)"
+)
+
+# Per-hour columns for the user behavior matrix: QUERIES_H00..QUERIES_H23 and
+# AVG_DURATION_SEC_H00..AVG_DURATION_SEC_H23 (hours with no queries are 0).
+_HOURLY_QUERY_COUNTS_EXPR = ",\n            ".join(
+    f"COUNT_IF(DATE_PART('HOUR', qh.start_time) = {hour}) AS QUERIES_H{hour:02d}"
+    for hour in range(24)
+)
+_HOURLY_AVG_DURATIONS_EXPR = ",\n            ".join(
+    f"COALESCE(ROUND(AVG(IFF(DATE_PART('HOUR', qh.start_time) = {hour}, qh.total_elapsed_time / 1000.0, NULL)), 2), 0) "
+    f"AS AVG_DURATION_SEC_H{hour:02d}"
+    for hour in range(24)
+)
+
 # This dictionary holds SQL queries specific to the User 360 Analysis dashboard.
 # It uses the exact queries you provided.
 USER_360_SQL_QUERIES: Dict[str, str] = {
     # Core Metrics - 8 Key Performance Indicators
+    # Users and roles are aggregated in a single scan of query history: GROUPING SETS returns
+    # both granularities from one GROUP BY, and GROUPING() tells the two kinds of rows apart.
     "cost_by_user_and_role": """
-        WITH warehouse_rates AS (
-            SELECT * FROM VALUES
-                ('X-Small', 1), ('Small', 2), ('Medium', 4), ('Large', 8),
-                ('X-Large', 16), ('2X-Large', 32), ('3X-Large', 64), ('4X-Large', 128)
-            AS warehouse_size(size, credits_per_hour)
-        ),
-        user_costs AS (
+        WITH grouped_costs AS (
             SELECT
-                qh.user_name AS name,
-                ROUND(SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * wr.credits_per_hour * 3.0), 2) AS cost_usd,
-                'User' AS type
+                IFF(GROUPING(qh.user_name) = 0, qh.user_name, qh.role_name) AS name,
+                ROUND(SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * {credits_per_hour} * 3.0), 2) AS cost_usd,
+                IFF(GROUPING(qh.user_name) = 0, 'User', 'Role') AS type
             FROM snowflake.account_usage.query_history qh
-            JOIN warehouse_rates wr ON qh.warehouse_size = wr.size
             WHERE qh.start_time >= '{start_date}'
+            AND qh.start_time < '{end_date}'
             AND qh.warehouse_name IS NOT NULL
-            AND qh.user_name IS NOT NULL
             {user_filter}
-            GROUP BY qh.user_name
+            GROUP BY GROUPING SETS ((qh.user_name), (qh.role_name))
+        )
+        SELECT name, cost_usd, type
+        FROM grouped_costs
+        WHERE name IS NOT NULL
+        ORDER BY cost_usd DESC
+        LIMIT 10
+    """,
+
+    "user_360_kpi_bundle": """
+        WITH periods AS (
+            SELECT 'current' AS period, '{start_date}'::TIMESTAMP_LTZ AS period_start, '{end_date}'::TIMESTAMP_LTZ AS period_end
+            UNION ALL
+            SELECT 'previous', '{prev_start_date}'::TIMESTAMP_LTZ, '{prev_end_date}'::TIMESTAMP_LTZ
         ),
-        role_costs AS (
+        period_kpis AS (
             SELECT
-                qh.role_name AS name,
-                ROUND(SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * wr.credits_per_hour * 3.0), 2) AS cost_usd,
-                'Role' AS type
+                p.period,
+                COUNT_IF(
+                    qh.user_name IS NOT NULL
+                    AND qh.query_type NOT IN ('DESCRIBE', 'SHOW', 'USE')
+                    AND qh.execution_status IN ('SUCCESS', 'FAIL')
+                ) AS total_queries_run,
+                COUNT(DISTINCT qh.user_name) AS total_active_users,
+                AVG(IFF(qh.execution_status = 'SUCCESS' AND qh.total_elapsed_time > 0, qh.total_elapsed_time, NULL)) / 1000.0 AS avg_query_duration,
+                COUNT_IF(qh.execution_status = 'FAIL') * 100.0 / NULLIF(COUNT(*), 0) AS failed_queries_percentage
             FROM snowflake.account_usage.query_history qh
-            JOIN warehouse_rates wr ON qh.warehouse_size = wr.size
-            WHERE qh.start_time >= '{start_date}'
-            AND qh.warehouse_name IS NOT NULL
-            AND qh.role_name IS NOT NULL
+            JOIN periods p ON qh.start_time >= p.period_start AND qh.start_time < p.period_end
+            WHERE qh.start_time >= '{prev_start_date}'
+            AND qh.start_time < '{end_date}'
             {user_filter}
-            GROUP BY qh.role_name
+            GROUP BY p.period
         )
-        SELECT name, cost_usd, type FROM user_costs
-        UNION ALL
-        SELECT name, cost_usd, type FROM role_costs
-        ORDER BY cost_usd DESC
-        LIMIT 10
+        SELECT
+            p.period AS PERIOD,
+            COALESCE(k.total_queries_run, 0) AS TOTAL_QUERIES_RUN,
+            COALESCE(k.total_active_users, 0) AS TOTAL_ACTIVE_USERS,
+            COALESCE(ROUND(k.avg_query_duration, 2), 0) AS AVG_QUERY_DURATION,
+            COALESCE(ROUND(k.failed_queries_percentage, 2), 0) AS FAILED_QUERIES_PERCENTAGE
+        FROM periods p
+        LEFT JOIN period_kpis k ON k.period = p.period
     """,
 
     "percentage_high_cost_users": """
-        WITH warehouse_rates AS (
-            SELECT * FROM VALUES
-                ('X-Small', 1), ('Small', 2), ('Medium', 4), ('Large', 8),
-                ('X-Large', 16), ('2X-Large', 32), ('3X-Large', 64), ('4X-Large', 128)
-            AS warehouse_size(size, credits_per_hour)
-        ),
-        user_total_costs AS (
+        WITH user_total_costs AS (
             SELECT
                 qh.user_name,
-                SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * wr.credits_per_hour * 3.0) AS total_user_cost_usd
+                SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * {credits_per_hour} * 3.0) AS total_user_cost_usd
             FROM snowflake.account_usage.query_history qh
-            JOIN warehouse_rates wr ON qh.warehouse_size = wr.size
             WHERE qh.start_time >= '{start_date}'
+            AND qh.start_time < '{end_date}'
             AND qh.warehouse_name IS NOT NULL
             AND qh.user_name IS NOT NULL
             {user_filter}
@@ -92,116 +125,69 @@ USER_360_SQL_QUERIES: Dict[str, str] = {
             ) AS metric_value
     """,
 
-    "total_queries_run": """
-        SELECT COUNT(*) AS metric_value
-        FROM snowflake.account_usage.query_history
-        WHERE start_time >= '{start_date}'
-            AND user_name IS NOT NULL
-            {user_filter}
-            AND query_type NOT IN ('DESCRIBE', 'SHOW', 'USE')
-            AND execution_status IN ('SUCCESS', 'FAIL');
-    """,
-
     "total_users_defined": """
         SELECT
             COUNT(*) AS metric_value
-        FROM snowflake.account_usage.users
+        FROM {users_table}
         WHERE deleted_on IS NULL
     """,
 
-    "total_active_users": """
-        SELECT COUNT(DISTINCT user_name) AS metric_value
-        FROM snowflake.account_usage.query_history
-        WHERE start_time >= '{start_date}'
-        AND user_name IS NOT NULL
-        {user_filter}
-    """,
-
-    "avg_cost_per_user": """
-        WITH warehouse_rates AS (
-            SELECT * FROM VALUES
-                ('X-Small', 1), ('Small', 2), ('Medium', 4), ('Large', 8),
-                ('X-Large', 16), ('2X-Large', 32), ('3X-Large', 64), ('4X-Large', 128)
-            AS warehouse_size(size, credits_per_hour)
+    "avg_cost_per_user_both_periods": """
+        WITH periods AS (
+            SELECT 'current' AS period, '{start_date}'::TIMESTAMP_LTZ AS period_start, '{end_date}'::TIMESTAMP_LTZ AS period_end
+            UNION ALL
+            SELECT 'previous', '{prev_start_date}'::TIMESTAMP_LTZ, '{prev_end_date}'::TIMESTAMP_LTZ
         ),
         user_costs AS (
             SELECT
+                p.period,
                 qh.user_name,
-                ROUND(SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * wr.credits_per_hour * 3.0), 2) AS user_cost
+                ROUND(SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * {credits_per_hour} * 3.0), 2) AS user_cost
             FROM snowflake.account_usage.query_history qh
-            JOIN warehouse_rates wr ON qh.warehouse_size = wr.size
-            WHERE qh.start_time >= '{start_date}'
+            JOIN periods p ON qh.start_time >= p.period_start AND qh.start_time < p.period_end
+            WHERE qh.start_time >= '{prev_start_date}'
+            AND qh.start_time < '{end_date}'
             AND qh.user_name IS NOT NULL
             AND qh.warehouse_name IS NOT NULL
             {user_filter}
-            GROUP BY qh.user_name
+            GROUP BY p.period, qh.user_name
         )
-        SELECT COALESCE(ROUND(AVG(user_cost), 2), 0) AS metric_value
-        FROM user_costs
+        SELECT
+            p.period AS PERIOD,
+            COALESCE(ROUND(AVG(uc.user_cost), 2), 0) AS METRIC_VALUE
+        FROM periods p
+        LEFT JOIN user_costs uc ON uc.period = p.period
+        GROUP BY p.period
     """,
 
     "high_cost_users_count": """
-        WITH warehouse_rates AS (
-            SELECT * FROM VALUES
-                ('X-Small', 1), ('Small', 2), ('Medium', 4), ('Large', 8),
-                ('X-Large', 16), ('2X-Large', 32), ('3X-Large', 64), ('4X-Large', 128)
-            AS warehouse_size(size, credits_per_hour)
-        ),
-        user_costs AS (
+        WITH user_costs AS (
             SELECT
                 qh.user_name,
-                SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * wr.credits_per_hour * 3.0) AS user_cost
+                SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * {credits_per_hour} * 3.0) AS user_cost
             FROM snowflake.account_usage.query_history qh
-            JOIN warehouse_rates wr ON qh.warehouse_size = wr.size
             WHERE qh.start_time >= '{start_date}'
+            AND qh.start_time < '{end_date}'
             AND qh.user_name IS NOT NULL
             AND qh.warehouse_name IS NOT NULL
             {user_filter}
             GROUP BY qh.user_name
-            HAVING SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * wr.credits_per_hour * 3.0) > 100
+            HAVING SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * {credits_per_hour} * 3.0) > 100
         )
         SELECT COUNT(*) AS metric_value FROM user_costs
     """,
 
-    "failed_queries_percentage": """
-        WITH query_stats AS (
-            SELECT
-                COUNT(*) AS total_queries,
-                COUNT(CASE WHEN execution_status = 'FAIL' THEN 1 END) AS failed_queries
-            FROM snowflake.account_usage.query_history
-            WHERE start_time >= '{start_date}'
-            {user_filter}
-        )
-        SELECT COALESCE(ROUND((failed_queries * 100.0 / NULLIF(total_queries, 0)), 2), 0) AS metric_value
-        FROM query_stats
-    """,
-
-    "avg_query_duration": """
-        SELECT COALESCE(ROUND(AVG(total_elapsed_time) / 1000.0, 2), 0) AS metric_value
-        FROM snowflake.account_usage.query_history
-        WHERE start_time >= '{start_date}'
-        AND total_elapsed_time > 0
-        AND execution_status = 'SUCCESS'
-        {user_filter}
-    """,
-
     "cost_by_user_priority": """
-        WITH warehouse_rates AS (
-            SELECT * FROM VALUES
-                ('X-Small', 1), ('Small', 2), ('Medium', 4), ('Large', 8),
-                ('X-Large', 16), ('2X-Large', 32), ('3X-Large', 64), ('4X-Large', 128)
-            AS warehouse_size(size, credits_per_hour)
-        ),
-        user_raw_costs AS (
+        WITH user_raw_costs AS (
             SELECT
                 qh.user_name,
-                SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * wr.credits_per_hour * 3.0) AS raw_total_cost_usd,
+                SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * {credits_per_hour} * 3.0) AS raw_total_cost_usd,
                 COUNT(DISTINCT qh.query_id) AS query_count,
                 AVG(qh.total_elapsed_time / 1000.0) AS raw_avg_duration_sec,
                 COUNT(CASE WHEN qh.execution_status = 'FAIL' THEN 1 END) AS failed_queries
             FROM snowflake.account_usage.query_history qh
-            JOIN warehouse_rates wr ON qh.warehouse_size = wr.size
             WHERE qh.start_time >= '{start_date}'
+            AND qh.start_time < '{end_date}'
             AND qh.user_name IS NOT NULL
             AND qh.warehouse_name IS NOT NULL
             {user_filter}
@@ -242,6 +228,7 @@ ELSE 'Optimized Usage 🟢'
                 bytes_scanned
             FROM snowflake.account_usage.query_history
             WHERE start_time >= '{start_date}'
+            AND start_time < '{end_date}'
             AND user_name IS NOT NULL
             {user_filter}
         )
@@ -275,69 +262,44 @@ ELSE 'Optimized Usage 🟢'
         LIMIT 20
     """,
 
-    "user_behavior_patterns": """
-        WITH warehouse_rates AS (
-            SELECT * FROM VALUES
-                ('X-Small', 1), ('Small', 2), ('Medium', 4), ('Large', 8),
-                ('X-Large', 16), ('2X-Large', 32), ('3X-Large', 64), ('4X-Large', 128)
-            AS warehouse_size(size, credits_per_hour)
-        ),
-        cost_ranked_users AS (
+    # One row per top user with 24 hourly query counts and 24 hourly average durations,
+    # pivoted by Snowflake via conditional aggregation so the page can chart it as-is.
+    "user_behavior_hourly_matrix": """
+        WITH cost_ranked_users AS (
             SELECT
                 qh.user_name,
-                ROUND(SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * wr.credits_per_hour * 3.0), 2) AS total_cost_usd
+                ROUND(SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * {credits_per_hour} * 3.0), 2) AS total_cost_usd
             FROM snowflake.account_usage.query_history qh
-            JOIN warehouse_rates wr ON qh.warehouse_size = wr.size
             WHERE qh.start_time >= '{start_date}'
+            AND qh.start_time < '{end_date}'
             AND qh.user_name IS NOT NULL
             AND qh.warehouse_name IS NOT NULL
             {user_filter}
             GROUP BY qh.user_name
             ORDER BY total_cost_usd DESC
             LIMIT 10
-        ),
-        hourly_usage AS (
-            SELECT
-                qh.user_name,
-                EXTRACT(HOUR FROM qh.start_time) AS hour_of_day,
-                COUNT(*) AS query_count,
-                ROUND(AVG(qh.total_elapsed_time / 1000.0), 2) AS avg_duration
-            FROM snowflake.account_usage.query_history qh
-            WHERE qh.start_time >= '{start_date}'
-            AND qh.user_name IN (SELECT user_name FROM cost_ranked_users)
-            {user_filter}
-            GROUP BY qh.user_name, EXTRACT(HOUR FROM qh.start_time)
         )
         SELECT
-            user_name AS USER_NAME,
-            hour_of_day AS HOUR_OF_DAY,
-            SUM(query_count) AS TOTAL_QUERIES,
-            ROUND(AVG(query_count), 2) AS AVG_QUERIES_PER_HOUR,
-            ROUND(AVG(avg_duration), 2) AS AVG_DURATION_SEC,
-            CASE
-                WHEN hour_of_day BETWEEN 0 AND 6 THEN 'Off-Hours'
-                WHEN hour_of_day BETWEEN 7 AND 18 THEN 'Business Hours'
-                ELSE 'Evening'
-            END AS TIME_CATEGORY
-        FROM hourly_usage
-        GROUP BY user_name, hour_of_day
-        ORDER BY user_name, hour_of_day
+            qh.user_name AS USER_NAME,
+            {hourly_query_counts},
+            {hourly_avg_durations}
+        FROM snowflake.account_usage.query_history qh
+        WHERE qh.start_time >= '{start_date}'
+        AND qh.start_time < '{end_date}'
+        AND qh.user_name IN (SELECT user_name FROM cost_ranked_users)
+        {user_filter}
+        GROUP BY qh.user_name
+        ORDER BY qh.user_name
     """,
 
     "optimization_opportunities": """
-        WITH warehouse_rates AS (
-            SELECT * FROM VALUES
-                ('X-Small', 1), ('Small', 2), ('Medium', 4), ('Large', 8),
-                ('X-Large', 16), ('2X-Large', 32), ('3X-Large', 64), ('4X-Large', 128)
-            AS warehouse_size(size, credits_per_hour)
-        ),
-        cost_ranked_users AS (
+        WITH cost_ranked_users AS (
             SELECT
                 qh.user_name,
-                SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * wr.credits_per_hour * 3.0) AS total_cost_usd
+                SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * {credits_per_hour} * 3.0) AS total_cost_usd
             FROM snowflake.account_usage.query_history qh
-            JOIN warehouse_rates wr ON qh.warehouse_size = wr.size
             WHERE qh.start_time >= '{start_date}'
+            AND qh.start_time < '{end_date}'
             AND qh.user_name IS NOT NULL
             AND qh.warehouse_name IS NOT NULL
             {user_filter}
@@ -353,11 +315,11 @@ ELSE 'Optimized Usage 🟢'
                 COUNT(CASE WHEN qh.total_elapsed_time > 300000 THEN 1 END) AS long_queries,
                 COUNT(CASE WHEN qh.execution_status = 'FAIL' THEN 1 END) AS failed_queries,
                 COUNT(CASE WHEN COALESCE(qh.bytes_scanned, 0) > 1000000000 THEN 1 END) AS high_scan_queries,
-                SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * wr.credits_per_hour * 3.0) AS total_cost_usd,
+                SUM(qh.total_elapsed_time / 1000.0 / 3600.0 * {credits_per_hour} * 3.0) AS total_cost_usd,
                 AVG(qh.total_elapsed_time / 1000.0) AS avg_duration
             FROM snowflake.account_usage.query_history qh
-            JOIN warehouse_rates wr ON qh.warehouse_size = wr.size
             WHERE qh.start_time >= '{start_date}'
+            AND qh.start_time < '{end_date}'
             AND qh.user_name IS NOT NULL
             AND qh.warehouse_name IS NOT NULL
             AND qh.user_name IN (SELECT user_name FROM cost_ranked_users)
@@ -396,3 +358,15 @@ ELSE 'Optimized Usage 🟢'
         ORDER BY TOTAL_COST_USD DESC, LONG_QUERY_PERCENTAGE DESC
     """
 }
+
+# Read-only from here on: the loaded queries are shared by every Streamlit session.
+USER_360_SQL_QUERIES = MappingProxyType({
+    query_name: query_text
+        .replace("{credits_per_hour}", _CREDITS_PER_HOUR_EXPR)
+        .replace("{hourly_query_counts}", _HOURLY_QUERY_COUNTS_EXPR)
+        .replace("{hourly_avg_durations}", _HOURLY_AVG_DURATIONS_EXPR)
+    for query_name, query_text in USER_360_SQL_QUERIES.items()
+})
+
+# The name DataFetcher's loader reads from every query file
+SQL_QUERIES = USER_360_SQL_QUERIES
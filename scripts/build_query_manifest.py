@@ -0,0 +1,28 @@
+# finops_dashboard/scripts/build_query_manifest.py
+
+"""
+Writes queries/_manifest.json: every SQL_QUERIES mapping in the queries folder, in one file.
+At startup DataFetcher reads this single file instead of executing each query module.
+Re-run it after editing any query file (a manifest older than the query files is ignored).
+
+Usage: python scripts/build_query_manifest.py
+"""
+
+import os
+import sys
+
+# Make the project root importable when run as a script
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.data_fetcher import DataFetcher
+
+
+def main() -> None:
+    manifest_path = DataFetcher.write_query_manifest(os.path.join(project_root, "queries"))
+    print(f"Wrote {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
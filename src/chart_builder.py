@@ -1,17 +1,59 @@
 # finops_dashboard/src/chart_builder.py
 
+from __future__ import annotations
+
+import functools
+import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 import logging
-from typing import Optional, List, Dict, Any, Union
+from typing import Final, Literal, Optional, List, Dict, Any, Union
+
+# Figures are built as plain dicts in Plotly's JSON schema, which st.plotly_chart accepts directly.
+# st.plotly_chart still turns the dict into a validated go.Figure when it renders, so this saves
+# no validation work; invalid properties surface at render time rather than at build time. What
+# it does buy is keeping plotly itself off this module's import path.
 
 # Import utilities and configuration
 from src.utils import handle_errors
-from src.config import PRIMARY_COLOR, ACCENT_COLOR_SCHEME, PLOTLY_LAYOUT_DEFAULTS
+from src.config import PRIMARY_COLOR, ACCENT_COLOR_SCHEME, PLOTLY_LAYOUT_DEFAULTS, PRIORITY_LEVELS
 
 logger = logging.getLogger(__name__)
 
+# Priority levels in display order and their bar colors, built once at import
+_PRIORITY_ORDER: Final[List[str]] = list(PRIORITY_LEVELS.keys())
+_PRIORITY_COLOR_MAP: Final[Dict[str, str]] = {level: style['text_color'] for level, style in PRIORITY_LEVELS.items()}
+
+# Traces at least this long send their float values as float32, halving the payload shipped to the
+# browser; shorter ones keep full precision so hover labels show exact cents.
+_FLOAT32_MIN_POINTS: Final[int] = 10_000
+
+def _plot_values(series: pd.Series) -> np.ndarray:
+    """Returns a column as a numpy array for a trace, narrowed to float32 for long float columns."""
+    if len(series) >= _FLOAT32_MIN_POINTS and pd.api.types.is_float_dtype(series):
+        return series.to_numpy(dtype=np.float32)
+    return series.to_numpy()
+
+# Axis lines are always visible, drawn in light gray
+_AXIS_LINE: Final[Dict[str, Any]] = {"showline": True, "linewidth": 1, "linecolor": "lightgray"}
+
+# Shared default layout, built once at import; _build_layout copies the parts it extends
+_DEFAULT_LAYOUT: Final[Dict[str, Any]] = {
+    "title": {
+        "x": 0.05, # Align title to left
+        "font": {"size": PLOTLY_LAYOUT_DEFAULTS["title_font_size"], "color": PLOTLY_LAYOUT_DEFAULTS["title_font_color"]},
+    },
+    "plot_bgcolor": PLOTLY_LAYOUT_DEFAULTS["plot_bgcolor"],
+    "paper_bgcolor": PLOTLY_LAYOUT_DEFAULTS["paper_bgcolor"],
+    "font": PLOTLY_LAYOUT_DEFAULTS["font"],
+    "margin": PLOTLY_LAYOUT_DEFAULTS["margin"],
+    "height": PLOTLY_LAYOUT_DEFAULTS["height"],
+    "xaxis": {**PLOTLY_LAYOUT_DEFAULTS["xaxis"], **_AXIS_LINE},
+    "yaxis": {**PLOTLY_LAYOUT_DEFAULTS["yaxis"], **_AXIS_LINE},
+    "legend": PLOTLY_LAYOUT_DEFAULTS["legend"],
+    "hovermode": "x unified", # Shows tooltip for all series at a given x-value
+    "colorway": list(ACCENT_COLOR_SCHEME), # Apply consistent color scheme
+}
+
 class ChartBuilder:
     """
     Responsible for generating various Plotly charts from DataFrames.
@@ -19,30 +61,35 @@ class ChartBuilder:
     """
 
     @staticmethod
-    def _apply_default_layout(fig: go.Figure, title: str, y_axis_title: str = "", x_axis_title: str = ""):
-        """Applies consistent default layout settings to a Plotly figure."""
-        fig.update_layout(
-            title_text=f"<b>{title}</b>",
-            title_x=0.05, # Align title to left
-            title_font_size=PLOTLY_LAYOUT_DEFAULTS["title_font_size"],
-            title_font_color=PLOTLY_LAYOUT_DEFAULTS["title_font_color"],
-            plot_bgcolor=PLOTLY_LAYOUT_DEFAULTS["plot_bgcolor"],
-            paper_bgcolor=PLOTLY_LAYOUT_DEFAULTS["paper_bgcolor"],
-            font=PLOTLY_LAYOUT_DEFAULTS["font"],
-            margin=PLOTLY_LAYOUT_DEFAULTS["margin"],
-            height=PLOTLY_LAYOUT_DEFAULTS["height"],
-            xaxis_title=x_axis_title,
-            yaxis_title=y_axis_title,
-            xaxis=PLOTLY_LAYOUT_DEFAULTS["xaxis"],
-            yaxis=PLOTLY_LAYOUT_DEFAULTS["yaxis"],
-            legend=PLOTLY_LAYOUT_DEFAULTS["legend"],
-            hovermode="x unified", # Shows tooltip for all series at a given x-value
-            colorway=ACCENT_COLOR_SCHEME # Apply consistent color scheme
-        )
-        # Ensure axis lines are visible by setting their color explicitly
-        fig.update_xaxes(showline=True, linewidth=1, linecolor='lightgray')
-        fig.update_yaxes(showline=True, linewidth=1, linecolor='lightgray')
+    @functools.lru_cache(maxsize=1) # Process-wide setting; only needs doing once
+    def configure_json_engine() -> None:
+        """
+        Switches Plotly's figure-to-JSON serialization (what st.plotly_chart sends to the browser)
+        to orjson when it is installed; orjson also serializes numpy arrays natively.
+        Without orjson, Plotly's default json engine is kept.
+        """
+        try:
+            import orjson # noqa: F401 -- optional dependency, only checked for here
+        except ImportError:
+            logger.debug("orjson not installed; Plotly keeps its default JSON engine.")
+            return
 
+        import plotly.io as pio
+        pio.json.config.default_engine = "orjson"
+        logger.info("Plotly JSON engine set to orjson.")
+
+    @staticmethod
+    def _build_layout(title: str, y_axis_title: str = "", x_axis_title: str = "") -> Dict[str, Any]:
+        """
+        Returns the default layout with the chart's title and axis titles filled in.
+        The title and axis dicts are fresh copies, so callers may extend them in place.
+        """
+        return {
+            **_DEFAULT_LAYOUT,
+            "title": {**_DEFAULT_LAYOUT["title"], "text": f"<b>{title}</b>"},
+            "xaxis": {**_DEFAULT_LAYOUT["xaxis"], "title": {"text": x_axis_title}},
+            "yaxis": {**_DEFAULT_LAYOUT["yaxis"], "title": {"text": y_axis_title}},
+        }
 
     @staticmethod
     @handle_errors
@@ -55,7 +102,7 @@ class ChartBuilder:
         y_axis_title: str = "",
         line_color: str = PRIMARY_COLOR,
         hover_name_col: Optional[str] = None # For better hover info if needed
-    ) -> Optional[go.Figure]:
+    ) -> Optional[Dict[str, Any]]:
         """
         Builds a basic line chart.
 
@@ -70,7 +117,7 @@ class ChartBuilder:
             hover_name_col (str, optional): Column to display as name on hover.
 
         Returns:
-            Optional[go.Figure]: A Plotly Figure object or None if an error occurs.
+            Optional[Dict[str, Any]]: A Plotly figure as a plain dict (for st.plotly_chart) or None if an error occurs.
         """
         if df.empty:
             logger.warning(f"Empty DataFrame provided for line chart: {title}")
@@ -80,42 +127,50 @@ class ChartBuilder:
         if not all(col in df.columns for col in [x_col, y_col]):
             logger.error(f"Missing required columns for line chart: {x_col}, {y_col}")
             return None
-            
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=df[x_col],
-            y=df[y_col],
-            mode='lines+markers', # Show both lines and markers
-            name=y_col.replace("_", " ").title(), # Default name in legend
-            line=dict(color=line_color, width=3),
-            marker=dict(size=6, color=line_color, line=dict(width=1, color='DarkSlateGrey')),
-            hoverinfo='x+y+name',
-            hoverlabel=dict(bgcolor='white', font_size=12, namelength=-1),
-            hovertemplate=
+
+        # Snowflake DATE columns arrive as object dtype (datetime.date values). Convert them on a
+        # copy so the date axis below applies, without mutating the caller's (possibly cached) DataFrame.
+        if df[x_col].dtype == object:
+            x_as_datetime = pd.to_datetime(df[x_col], errors="coerce")
+            if x_as_datetime.notna().all():
+                df = df.assign(**{x_col: x_as_datetime})
+
+        # Plain numpy arrays skip plotly's per-column Series introspection and copy
+        trace = {
+            "type": "scatter",
+            "x": df[x_col].to_numpy(),
+            "y": _plot_values(df[y_col]),
+            "mode": "lines+markers", # Show both lines and markers
+            "name": y_col.replace("_", " ").title(), # Default name in legend
+            "line": {"color": line_color, "width": 3},
+            "marker": {"size": 6, "color": line_color, "line": {"width": 1, "color": "DarkSlateGrey"}},
+            "hoverinfo": "x+y+name",
+            "hoverlabel": {"bgcolor": "white", "font": {"size": 12}, "namelength": -1},
+            "hovertemplate":
                 "<b>Date</b>: %{x}<br>" +
-                f"<b>{y_axis_title}</b>: %{{y:.2f}}<extra></extra>" # Format y for currency etc.
-        ))
+                f"<b>{y_axis_title}</b>: %{{y:.2f}}<extra></extra>", # Format y for currency etc.
+        }
 
-        ChartBuilder._apply_default_layout(fig, title, y_axis_title, x_axis_title)
+        layout = ChartBuilder._build_layout(title, y_axis_title, x_axis_title)
         
         # Adjust x-axis for dates
         if pd.api.types.is_datetime64_any_dtype(df[x_col]):
-            fig.update_xaxes(
+            layout["xaxis"].update(
                 tickformat="%b %d",
-                rangeselector=dict(
-                    buttons=list([
-                        dict(count=7, label="7d", step="day", stepmode="backward"),
-                        dict(count=1, label="1m", step="month", stepmode="backward"),
-                        dict(count=6, label="6m", step="month", stepmode="backward"),
-                        dict(count=1, label="1y", step="year", stepmode="backward"),
-                        dict(step="all")
-                    ])
-                ),
-                rangeslider=dict(visible=True),
+                rangeselector={
+                    "buttons": [
+                        {"count": 7, "label": "7d", "step": "day", "stepmode": "backward"},
+                        {"count": 1, "label": "1m", "step": "month", "stepmode": "backward"},
+                        {"count": 6, "label": "6m", "step": "month", "stepmode": "backward"},
+                        {"count": 1, "label": "1y", "step": "year", "stepmode": "backward"},
+                        {"step": "all"},
+                    ]
+                },
+                rangeslider={"visible": True},
                 type="date"
             )
         
-        return fig
+        return {"data": [trace], "layout": layout}
 
     @staticmethod
     @handle_errors
@@ -126,9 +181,9 @@ class ChartBuilder:
         title: str, 
         x_axis_title: str = "", 
         y_axis_title: str = "",
-        orientation: str = 'v', # 'v' for vertical, 'h' for horizontal
+        orientation: Literal['v', 'h'] = 'v', # 'v' for vertical, 'h' for horizontal
         color_col: Optional[str] = None # Column to use for coloring bars
-    ) -> Optional[go.Figure]:
+    ) -> Optional[Dict[str, Any]]:
         """
         Builds a basic bar chart.
 
@@ -143,7 +198,7 @@ class ChartBuilder:
             color_col (str, optional): Column to use for coloring bars (e.g., 'PRIORITY_LEVEL').
 
         Returns:
-            Optional[go.Figure]: A Plotly Figure object or None if an error occurs.
+            Optional[Dict[str, Any]]: A Plotly figure as a plain dict (for st.plotly_chart) or None if an error occurs.
         """
         if df.empty:
             logger.warning(f"Empty DataFrame provided for bar chart: {title}")
@@ -156,63 +211,54 @@ class ChartBuilder:
             logger.error(f"Missing required columns for bar chart: {', '.join([col for col in required_cols if col not in df.columns])}")
             return None
 
-        # Use Plotly Express for simpler bar charts, especially with color
-        if color_col and color_col in df.columns:
-            # Custom sorting for PRIORITY_LEVEL if it's the color_col
-            if color_col == 'PRIORITY_LEVEL' and all(level in df[color_col].unique() for level in PRIORITY_LEVELS.keys()):
-                # Create a mapping for sorting
-                priority_order = list(PRIORITY_LEVELS.keys())
-                df[color_col] = pd.Categorical(df[color_col], categories=priority_order, ordered=True)
-                df = df.sort_values(by=color_col)
-
-                # Custom colors for priority levels
-                color_map = {level: PRIORITY_LEVELS[level]['text_color'] for level in PRIORITY_LEVELS.keys()}
-                color_discrete_map = {k: v for k, v in color_map.items() if k in df[color_col].unique()}
-                
-                fig = px.bar(
-                    df, 
-                    x=x_col, 
-                    y=y_col, 
-                    color=color_col, 
-                    orientation=orientation,
-                    color_discrete_map=color_discrete_map,
-                    text_auto='.2s' if 'credits' in y_col.lower() else False, # Auto text for credits
-                    hover_name=x_col,
-                    hover_data={x_col: True, y_col: ':.2f', color_col: True}
-                )
-            else:
-                fig = px.bar(
-                    df, 
-                    x=x_col, 
-                    y=y_col, 
-                    color=color_col, 
-                    orientation=orientation,
-                    color_discrete_sequence=ACCENT_COLOR_SCHEME,
-                    text_auto='.2s' if 'credits' in y_col.lower() else False,
-                    hover_name=x_col,
-                    hover_data={x_col: True, y_col: ':.2f', color_col: True}
-                )
+        # Build bar traces directly rather than going through plotly express,
+        # which copies and reshapes the whole DataFrame on every call.
+        # Horizontal bars put the value on the x-axis and the category on the y-axis.
+        value_axis = 'x' if orientation == 'h' else 'y'
+        category_axis = 'y' if orientation == 'h' else 'x'
+        bar_style: Dict[str, Any] = {
+            "type": "bar",
+            "orientation": orientation,
+            "hovertemplate": f"<b>%{{{category_axis}}}</b><br>{y_col}: %{{{value_axis}:.2f}}<extra>%{{fullData.name}}</extra>",
+        }
+        if 'credits' in y_col.lower():
+            bar_style["texttemplate"] = f"%{{{value_axis}:.2s}}" # Auto text for credits
+
+        def _bar(frame: pd.DataFrame, name: str, color: str) -> Dict[str, Any]:
+            categories, values = frame[x_col].to_numpy(), _plot_values(frame[y_col])
+            x_vals, y_vals = (values, categories) if orientation == 'h' else (categories, values)
+            return {**bar_style, "x": x_vals, "y": y_vals, "name": name, "marker": {"color": color}}
+
+        if color_col:
+            color_map: Dict[str, str] = {}
+            # Custom sorting and colors for PRIORITY_LEVEL if it's the color_col
+            if color_col == 'PRIORITY_LEVEL':
+                # One pass to find the distinct levels; the membership test then runs on those only
+                levels = pd.Categorical(df[color_col])
+                if set(levels.categories) <= _PRIORITY_COLOR_MAP.keys():
+                    # Sort on a copy so the caller's (possibly cached) DataFrame is left untouched
+                    df = df.assign(**{color_col: levels.set_categories(_PRIORITY_ORDER, ordered=True)})
+                    df = df.sort_values(by=color_col)
+                    color_map = _PRIORITY_COLOR_MAP
+
+            # One trace per category, like px.bar(color=...), so each gets its own legend entry
+            traces = [
+                _bar(group, str(name), color_map.get(name, ACCENT_COLOR_SCHEME[i % len(ACCENT_COLOR_SCHEME)]))
+                for i, (name, group) in enumerate(df.groupby(color_col, sort=False, observed=True))
+            ]
         else:
-            fig = px.bar(
-                df, 
-                x=x_col, 
-                y=y_col, 
-                orientation=orientation,
-                color_discrete_sequence=[PRIMARY_COLOR], # Use primary color for single-color bars
-                text_auto='.2s' if 'credits' in y_col.lower() else False,
-                hover_name=x_col,
-                hover_data={x_col: True, y_col: ':.2f'}
-            )
-            
-        ChartBuilder._apply_default_layout(fig, title, y_axis_title, x_axis_title)
-        
+            traces = [_bar(df, y_col, PRIMARY_COLOR)] # Use primary color for single-color bars
+
         # Adjust for horizontal bar chart
         if orientation == 'h':
-            fig.update_yaxes(autorange="reversed") # To show highest value at top for horizontal bars
             # Swap titles for horizontal chart
-            fig.update_layout(xaxis_title=y_axis_title, yaxis_title=x_axis_title)
+            layout = ChartBuilder._build_layout(title, y_axis_title=x_axis_title, x_axis_title=y_axis_title)
+            layout["yaxis"]["autorange"] = "reversed" # To show highest value at top for horizontal bars
+        else:
+            layout = ChartBuilder._build_layout(title, y_axis_title, x_axis_title)
+        layout["barmode"] = 'relative' # Match plotly express: categories stack on one bar slot
 
-        return fig
+        return {"data": traces, "layout": layout}
 
     @staticmethod
     @handle_errors
@@ -222,7 +268,7 @@ class ChartBuilder:
         values_col: str, 
         title: str, 
         hole: float = 0.4 # For a donut chart
-    ) -> Optional[go.Figure]:
+    ) -> Optional[Dict[str, Any]]:
         """
         Builds a pie/donut chart.
 
@@ -234,7 +280,7 @@ class ChartBuilder:
             hole (float): Value between 0 and 1 for the size of the hole in a donut chart. 0 for a regular pie chart.
 
         Returns:
-            Optional[go.Figure]: A Plotly Figure object or None if an error occurs.
+            Optional[Dict[str, Any]]: A Plotly figure as a plain dict (for st.plotly_chart) or None if an error occurs.
         """
         if df.empty:
             logger.warning(f"Empty DataFrame provided for pie chart: {title}")
@@ -244,8 +290,8 @@ class ChartBuilder:
             logger.error(f"Missing required columns for pie chart: {names_col}, {values_col}")
             return None
 
-        # Ensure values column is numeric
-        df[values_col] = pd.to_numeric(df[values_col], errors='coerce').fillna(0)
+        # Ensure values column is numeric (on a copy, leaving the caller's DataFrame untouched)
+        df = df.assign(**{values_col: pd.to_numeric(df[values_col], errors='coerce').fillna(0)})
 
         # Filter out zero values to prevent errors or empty slices
         df_filtered = df[df[values_col] > 0].copy()
@@ -254,81 +300,88 @@ class ChartBuilder:
             logger.warning(f"No non-zero values after filtering for pie chart: {title}")
             return None
 
-        fig = go.Figure(data=[go.Pie(
-            labels=df_filtered[names_col], 
-            values=df_filtered[values_col], 
-            hole=hole,
-            marker_colors=ACCENT_COLOR_SCHEME,
-            hoverinfo="label+percent+value",
-            textinfo="percent+label", # Show percentage and label on slices
-            textfont_size=12,
-            pull=[0.05 if df_filtered[values_col].iloc[i] == df_filtered[values_col].max() else 0 for i in range(len(df_filtered))] # Pull out largest slice
-        )])
+        values = df_filtered[values_col].to_numpy()
+        trace = {
+            "type": "pie",
+            "labels": df_filtered[names_col].to_numpy(),
+            "values": values,
+            "hole": hole,
+            "marker": {
+                "colors": list(ACCENT_COLOR_SCHEME),
+                "line": {"color": '#000000', "width": 1}, # Add thin black border to slices
+            },
+            "hoverinfo": "label+percent+value",
+            "textinfo": "percent+label", # Show percentage and label on slices
+            "textfont": {"size": 12},
+            "pull": np.where(values == values.max(), 0.05, 0.0), # Pull out largest slice
+        }
         
-        ChartBuilder._apply_default_layout(fig, title)
-        fig.update_traces(marker=dict(line=dict(color='#000000', width=1))) # Add thin black border to slices
+        layout = ChartBuilder._build_layout(title)
         
         # Don't show legend if there are too many slices (e.g., > 10)
         if len(df_filtered) > 10:
-            fig.update_layout(showlegend=False)
+            layout["showlegend"] = False
 
-        return fig
+        return {"data": [trace], "layout": layout}
 
     @staticmethod
     @handle_errors
     def build_heatmap(
-        df: pd.DataFrame, 
         x_labels: Union[List[str], pd.Series], # Can be hours, days etc.
         y_labels: Union[List[str], pd.Series], # Can be users, warehouses etc.
-        z_data: pd.DataFrame, # The pivoted data for the heatmap
+        z_data: Union[pd.DataFrame, np.ndarray], # The pivoted data for the heatmap
         title: str, 
         x_axis_title: str = "", 
         y_axis_title: str = "",
         colorscale: str = 'Viridis', # or 'Plasma', 'Portland', 'Greens'
-        show_values_on_hover: bool = True
-    ) -> Optional[go.Figure]:
+        show_values_on_hover: bool = True,
+        zmin: Optional[float] = None # Lower bound of the color scale; None lets Plotly infer it
+    ) -> Optional[Dict[str, Any]]:
         """
-        Builds a heatmap. Assumes z_data is already a pivoted DataFrame.
+        Builds a heatmap. Assumes z_data is already pivoted (a DataFrame or a 2-D array).
 
         Args:
-            df (pd.DataFrame): The original (unpivoted) DataFrame used to extract x/y labels if needed.
-                               Not directly used for z_data but good for context/column names.
             x_labels (Union[List[str], pd.Series]): Labels for the x-axis (columns of the pivoted data).
             y_labels (Union[List[str], pd.Series]): Labels for the y-axis (index of the pivoted data).
-            z_data (pd.DataFrame): The pivoted DataFrame containing the values for the heatmap cells.
-                                   Index should correspond to y_labels, columns to x_labels.
+            z_data (Union[pd.DataFrame, np.ndarray]): The pivoted values for the heatmap cells.
+                                   Rows should correspond to y_labels, columns to x_labels.
             title (str): The title of the chart.
             x_axis_title (str): The title for the x-axis.
             y_axis_title (str): The title for the y-axis.
             colorscale (str): Plotly color scale name (e.g., 'Viridis', 'Plasma').
             show_values_on_hover (bool): Whether to show values on hover.
+            zmin (float, optional): Lower bound of the color scale (e.g., 0 for counts and durations).
 
         Returns:
-            Optional[go.Figure]: A Plotly Figure object or None if an error occurs.
+            Optional[Dict[str, Any]]: A Plotly figure as a plain dict (for st.plotly_chart) or None if an error occurs.
         """
-        if z_data.empty:
-            logger.warning(f"Empty pivoted DataFrame provided for heatmap: {title}")
+        if z_data.size == 0:
+            logger.warning(f"Empty pivoted data provided for heatmap: {title}")
             return None
 
-        # Convert z_data to numpy array for Plotly heatmap trace
-        z_values = z_data.values
-
-        fig = go.Figure(data=go.Heatmap(
-            z=z_values,
-            x=x_labels, # Assuming x_labels are column names of z_data
-            y=y_labels, # Assuming y_labels are index names of z_data
-            colorscale=colorscale,
-            colorbar=dict(title=y_axis_title), # Or something more descriptive for the colorbar
-            hovertemplate=
+        # Convert z_data to numpy array for Plotly heatmap trace (no copy if it already is a float32 array)
+        # float32 halves the bytes serialized into the figure JSON; the color scale doesn't need more precision
+        z_values = np.asarray(z_data, dtype="float32")
+
+        trace = {
+            "type": "heatmap",
+            "z": z_values,
+            "x": x_labels, # Assuming x_labels are column names of z_data
+            "y": y_labels, # Assuming y_labels are index names of z_data
+            "colorscale": colorscale,
+            "colorbar": {"title": {"text": y_axis_title}}, # Or something more descriptive for the colorbar
+            "hovertemplate":
                 f"<b>{x_axis_title}</b>: %{{x}}<br>" +
                 f"<b>{y_axis_title}</b>: %{{y}}<br>" +
-                "<b>Value</b>: %{z:.2f}<extra></extra>"
-        ))
+                "<b>Value</b>: %{z:.2f}<extra></extra>",
+        }
+        if zmin is not None:
+            trace["zmin"] = zmin
         
-        ChartBuilder._apply_default_layout(fig, title, y_axis_title, x_axis_title)
+        layout = ChartBuilder._build_layout(title, y_axis_title, x_axis_title)
         
         # Ensure x-axis for hours are integers
         if all(isinstance(x, int) for x in x_labels):
-            fig.update_xaxes(type='category') # Treat hours as categories, not continuous numbers
+            layout["xaxis"]["type"] = 'category' # Treat hours as categories, not continuous numbers
 
-        return fig
\ No newline at end of file
+        return {"data": [trace], "layout": layout}
\ No newline at end of file
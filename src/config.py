@@ -1,6 +1,10 @@
 # finops_dashboard/src/config.py
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from enum import IntEnum
+from types import MappingProxyType
+from typing import NamedTuple, Tuple
 
 # --- Application Title and Description ---
 APP_TITLE = "Snowflake FinOps Dashboard"
@@ -42,15 +46,23 @@ DATE_RANGES = {
 DEFAULT_DATE_RANGE_INDEX = 1 # "Last 30 Days"
 
 # --- Metric Card Configuration ---
+@dataclass(frozen=True, slots=True)
+class MetricFormat:
+    """How a metric card value is formatted (immutable; read via attributes)."""
+    prefix: str = ""
+    suffix: str = ""
+    decimals: int = 0
+    thousands_sep: bool = False
+
 # Define how different types of metrics should be formatted
-METRIC_FORMATS = {
-    "currency": {"prefix": "$", "suffix": "", "decimals": 2, "thousands_sep": True},
-    "percentage": {"prefix": "", "suffix": "%", "decimals": 1, "thousands_sep": False},
-    "duration_seconds": {"prefix": "", "suffix": "s", "decimals": 1, "thousands_sep": False},
-    "duration_ms": {"prefix": "", "suffix": "ms", "decimals": 0, "thousands_sep": True},
-    "number": {"prefix": "", "suffix": "", "decimals": 0, "thousands_sep": True}, # Default for integers
-    "float_number": {"prefix": "", "suffix": "", "decimals": 2, "thousands_sep": True}, # For floats with 2 decimal places
-}
+METRIC_FORMATS = MappingProxyType({
+    "currency": MetricFormat(prefix="$", suffix="", decimals=2, thousands_sep=True),
+    "percentage": MetricFormat(prefix="", suffix="%", decimals=1, thousands_sep=False),
+    "duration_seconds": MetricFormat(prefix="", suffix="s", decimals=1, thousands_sep=False),
+    "duration_ms": MetricFormat(prefix="", suffix="ms", decimals=0, thousands_sep=True),
+    "number": MetricFormat(prefix="", suffix="", decimals=0, thousands_sep=True), # Default for integers
+    "float_number": MetricFormat(prefix="", suffix="", decimals=2, thousands_sep=True), # For floats with 2 decimal places
+})
 
 # --- Priority Level Definitions (for identifying High-Impact Users, Optimization opportunities) ---
 # Used by data_processor and ui_elements
@@ -91,6 +103,43 @@ PRIORITY_LEVELS = {
         "icon": "➖"
     }
 }
+# Read-only: shared by every session, so nothing may modify it in place
+PRIORITY_LEVELS = MappingProxyType({level: MappingProxyType(style) for level, style in PRIORITY_LEVELS.items()})
+
+class Priority(IntEnum):
+    """Integer codes for the PRIORITY_LEVELS keys, in the same order; index PRIORITY_STYLES with them."""
+    HIGH = 0          # "High Priority"
+    MEDIUM = 1        # "Medium Priority"
+    ABOVE_AVG = 2     # "Above Avg Cost"
+    GOOD = 3          # "Good Performance"
+    NA = 4            # "N/A"
+
+class PriorityStyle(NamedTuple):
+    """Display attributes of one priority level (same fields as a PRIORITY_LEVELS entry)."""
+    key: str # The PRIORITY_LEVELS key, e.g. "High Priority"
+    label: str
+    icon: str
+    bg_color: str
+    text_color: str
+    font_weight: str
+
+# PRIORITY_LEVELS as a tuple indexed by Priority, for per-row lookups without string hashing
+PRIORITY_STYLES: Tuple[PriorityStyle, ...] = tuple(
+    PriorityStyle(
+        key=level,
+        label=style["label"],
+        icon=style["icon"],
+        bg_color=style["bg_color"],
+        text_color=style["text_color"],
+        font_weight=style["font_weight"],
+    )
+    for level, style in PRIORITY_LEVELS.items()
+)
+assert len(PRIORITY_STYLES) == len(Priority), "Priority must have one member per PRIORITY_LEVELS entry"
+
+def get_priority_style(priority: Priority) -> PriorityStyle:
+    """Returns the display attributes for a priority code."""
+    return PRIORITY_STYLES[priority]
 
 # --- Plotly Chart Defaults ---
 PLOTLY_LAYOUT_DEFAULTS = {
@@ -275,4 +324,12 @@ SNOWFLAKE_ACCOUNT_USAGE_SCHEMA = "SNOWFLAKE.ACCOUNT_USAGE"
 QUERY_HISTORY_TABLE = f"{SNOWFLAKE_ACCOUNT_USAGE_SCHEMA}.QUERY_HISTORY"
 METERING_HISTORY_TABLE = f"{SNOWFLAKE_ACCOUNT_USAGE_SCHEMA}.METERING_HISTORY"
 LOGIN_HISTORY_TABLE = f"{SNOWFLAKE_ACCOUNT_USAGE_SCHEMA}.LOGIN_HISTORY"
-WAREHOUSE_METERING_HISTORY_TABLE = f"{SNOWFLAKE_ACCOUNT_USAGE_SCHEMA}.WAREHOUSE_METERING_HISTORY"
\ No newline at end of file
+WAREHOUSE_METERING_HISTORY_TABLE = f"{SNOWFLAKE_ACCOUNT_USAGE_SCHEMA}.WAREHOUSE_METERING_HISTORY"
+# Source for the user filter list. Point this at e.g. "<DB>.INFORMATION_SCHEMA.USERS"-style views
+# for reader accounts or deployments without ACCOUNT_USAGE access.
+USERS_TABLE = f"{SNOWFLAKE_ACCOUNT_USAGE_SCHEMA}.USERS"
+
+# Read-only result queries can bypass Snowpark's DataFrame layer and fetch Arrow result chunks
+# straight from the session's underlying connector connection (cursor.fetch_pandas_all()).
+# Off by default; the connection must accept '?' (qmark) bind markers.
+USE_CONNECTOR_FAST_PATH = False
@@ -1,64 +1,294 @@
 # finops_dashboard/src/data_fetcher.py
 
+import functools
+import json
 import logging
 import os
-import importlib.util
-from typing import Any, Dict, Optional, Union
+import re
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Collection, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
 import pandas as pd
 import streamlit as st
 from snowflake.snowpark import Session
 from snowflake.snowpark.exceptions import SnowparkSQLException
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Import utilities and configuration
-from src.utils import handle_errors, is_running_in_snowflake_env
-from src.config import QUERY_HISTORY_TABLE, METERING_HISTORY_TABLE, LOGIN_HISTORY_TABLE, WAREHOUSE_METERING_HISTORY_TABLE
+from src.utils import is_running_in_snowflake_env
+from src.config import USE_CONNECTOR_FAST_PATH, QUERY_HISTORY_TABLE, METERING_HISTORY_TABLE, LOGIN_HISTORY_TABLE, WAREHOUSE_METERING_HISTORY_TABLE, USERS_TABLE
 
 logger = logging.getLogger(__name__)
 
+# Placeholders whose values never change for the lifetime of the process.
+# They are substituted once when a query file is loaded, so each execution
+# only has to fill in the per-request values (dates, filter clauses).
+_STATIC_QUERY_PLACEHOLDERS: Dict[str, str] = {
+    "query_history_table": QUERY_HISTORY_TABLE,
+    "metering_history_table": METERING_HISTORY_TABLE,
+    "login_history_table": LOGIN_HISTORY_TABLE,
+    "warehouse_metering_history_table": WAREHOUSE_METERING_HISTORY_TABLE,
+    "users_table": USERS_TABLE,
+}
+
+# The same placeholders as literal '{name}' tokens, for plain substring replacement
+_STATIC_QUERY_TOKENS: Tuple[Tuple[str, str], ...] = tuple(
+    ("{" + name + "}", value) for name, value in _STATIC_QUERY_PLACEHOLDERS.items()
+)
+
+def _bind_static_placeholders(query_text: str) -> str:
+    """
+    Substitutes the static table names into a query. Plain str.replace per token is cheaper than
+    a str.format parse of the whole query, and leaves every other placeholder untouched.
+    """
+    for token, value in _STATIC_QUERY_TOKENS:
+        query_text = query_text.replace(token, value)
+    return query_text
+
+@st.cache_resource
+def _get_query_executor() -> ThreadPoolExecutor:
+    """
+    Shared worker pool for submitting independent queries concurrently.
+    Snowpark sessions accept statements from several threads, so the warehouse runs them side by side.
+    """
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="finops-query")
+
+# Results at least this long also get their float columns narrowed to float32; smaller
+# results keep full precision since their payload is negligible.
+_FLOAT_DOWNCAST_MIN_ROWS = 100_000
+
+def _downcast_numeric_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Narrows numeric columns to the smallest dtype that holds their values, shrinking the
+    pandas frame and the Plotly JSON payload built from it. Integers are downcast losslessly;
+    floats only for large results.
+    """
+    downcast_floats = len(df) >= _FLOAT_DOWNCAST_MIN_ROWS
+    narrowed = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_integer_dtype(series):
+            narrowed[col] = pd.to_numeric(series, downcast="integer")
+        elif downcast_floats and pd.api.types.is_float_dtype(series):
+            narrowed[col] = pd.to_numeric(series, downcast="float")
+    return df.assign(**narrowed) if narrowed else df
+
+# Name columns that repeat heavily across rows (one value per user, role or warehouse). Only these
+# are cast; dates and other text columns keep their object dtype regardless of result size.
+_CATEGORY_COLUMNS = frozenset({"USER_NAME", "ROLE_NAME", "WAREHOUSE_NAME"})
+
+def _categorize_text_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts the known low-cardinality name columns (_CATEGORY_COLUMNS) to categoricals: one small
+    integer code per row instead of a boxed Python string. These columns are only read for labels,
+    filters and observed=True groupbys; a fillna or setitem with a new label would raise.
+    """
+    categorized = {
+        col: df[col].astype("category")
+        for col in _CATEGORY_COLUMNS.intersection(df.columns)
+        if df[col].dtype == object
+    }
+    return df.assign(**categorized) if categorized else df
+
+# Optional filter placeholders: placeholder -> (params key, clause used when the value is set).
+_FILTER_CLAUSES: Dict[str, Tuple[str, str]] = {
+    "user_filter": ("user_name", "AND user_name = ?"),
+}
+
+# Quoted value placeholders such as '{start_date}' become bind markers;
+# bare placeholders such as {user_filter} stay in the template as clauses.
+_PLACEHOLDER_PATTERN = re.compile(r"'\{([A-Za-z_]\w*)\}'|\{([A-Za-z_]\w*)\}")
+
+class _CompiledQuery(NamedTuple):
+    """A query template with its value placeholders already replaced by '?' markers."""
+    # The template pre-parsed into (literal SQL, clause placeholder or None) pairs, so
+    # per-request assembly is a join rather than a fresh scan of the whole query.
+    segments: Tuple[Tuple[str, Optional[str]], ...]
+    placeholders: Tuple[str, ...] # Every placeholder, in the order its bind marker(s) appear
+
+@functools.lru_cache(maxsize=256)
+def _compile_query(query_text: str) -> _CompiledQuery:
+    """Compiles a query once; subsequent renders reuse the cached template."""
+    placeholders: List[str] = []
+    segments: List[Tuple[str, Optional[str]]] = []
+    literal_parts: List[str] = []
+    position = 0
+
+    # Split on placeholder matches only, so literal braces elsewhere in the SQL (JSON, regexes) are kept as-is
+    for match in _PLACEHOLDER_PATTERN.finditer(query_text):
+        literal_parts.append(query_text[position:match.start()])
+        position = match.end()
+        quoted_name, clause_name = match.groups()
+        if quoted_name:
+            placeholders.append(quoted_name)
+            literal_parts.append("?")
+            continue
+        if clause_name not in _FILTER_CLAUSES:
+            # Only filter clauses may appear bare; any other value would be bound but left in the SQL
+            raise ValueError(f"Placeholder '{{{clause_name}}}' must be quoted or be a filter clause.")
+        placeholders.append(clause_name)
+        segments.append(("".join(literal_parts), clause_name))
+        literal_parts = []
+
+    literal_parts.append(query_text[position:])
+    segments.append(("".join(literal_parts), None))
+    return _CompiledQuery(tuple(segments), tuple(placeholders))
+
+# Query registry. These live at module level rather than on DataFetcher because they are read
+# on every query lookup: a global load is cheaper than a class attribute lookup through `cls`.
+_ALL_QUERIES: Dict[str, Mapping[str, str]] = {} # Namespace -> read-only {query name: SQL}
+_QUERY_TEXTS: Dict[str, str] = {} # Flat 'namespace.query_name' -> SQL, for one-lookup resolution of loaded queries
+_QUERY_FILE_PATHS: Dict[str, Path] = {} # Namespace -> query file, indexed by set_queries_base_dir
+_QUERIES_LOCK = threading.Lock() # Sessions run on separate threads and may load the same file
+
+# Pre-extracted queries written by scripts/build_query_manifest.py, read in one go at startup.
+QUERY_MANIFEST_FILENAME = "_manifest.json"
+
+def _params_cache_key(params: Optional[Dict[str, Any]]) -> str:
+    """
+    Serializes query params into one canonical string for the result cache key.
+    Streamlit hashes a str in a single pass instead of walking the dict on every call.
+    """
+    return json.dumps(params or {}, sort_keys=True, default=str)
+
+@functools.lru_cache(maxsize=256)
+def _split_query_key(query_key: str) -> Optional[Tuple[str, str]]:
+    """Splits 'namespace.query_name' once per distinct key; pages request the same keys on every rerun."""
+    parts = query_key.split('.')
+    if len(parts) != 2:
+        return None
+    return parts[0], parts[1]
+
 class DataFetcher:
     """
     Manages loading, preparing, and executing Snowflake queries with caching.
     This is the central point for all database interactions.
     """
-    _all_queries: Dict[str, Dict[str, str]] = {}
     _queries_loaded = False
     _queries_base_dir: str = "" # To store the base path of the 'queries' directory
 
+    @staticmethod
+    def _namespace_for(filepath: Path) -> str:
+        """Queries are namespaced by filename (e.g., 'user_360_queries.py' -> 'user_360')."""
+        return filepath.stem.replace("_queries", "")
+
     @classmethod
     def set_queries_base_dir(cls, path: str):
-        """Sets the base path where query Python files are located."""
+        """
+        Sets the base path where query Python files are located and indexes the files in it.
+        Only the file names are read here; each file is loaded the first time one of its queries is requested.
+        """
+        if path == cls._queries_base_dir and _QUERY_FILE_PATHS:
+            return # Already indexed (this runs on every Streamlit rerun)
+
         cls._queries_base_dir = path
-        logger.debug(f"Query base directory set to: {cls._queries_base_dir}")
+        _QUERY_FILE_PATHS.clear()
+        if os.path.isdir(path):
+            _QUERY_FILE_PATHS.update(
+                (cls._namespace_for(filepath), filepath)
+                for filepath in sorted(Path(path).glob("*.py"))
+                if filepath.name != "__init__.py"
+            )
+        logger.debug(f"Query base directory set to: {cls._queries_base_dir} ({len(_QUERY_FILE_PATHS)} query files)")
+        with _QUERIES_LOCK:
+            cls._load_query_manifest(Path(path))
+
+    @staticmethod
+    def _register_queries(namespace: str, queries: Mapping[str, str]) -> None:
+        """
+        Stores a namespace's queries read-only, with the static table names bound now; only per-request placeholders remain.
+        Query texts are interned, so identical SQL across namespaces (or reloads) shares one string.
+        """
+        namespace_queries = MappingProxyType({
+            sys.intern(query_name): sys.intern(_bind_static_placeholders(query_text))
+            for query_name, query_text in queries.items()
+        })
+        _ALL_QUERIES[namespace] = namespace_queries
+        _QUERY_TEXTS.update((f"{namespace}.{query_name}", query_text) for query_name, query_text in namespace_queries.items())
+
+    @staticmethod
+    def _read_queries_file(filepath: Path) -> Optional[Mapping[str, str]]:
+        """
+        Returns the SQL_QUERIES mapping defined in a query file, or None if it has none.
+        The file is compiled and executed into a plain dict rather than imported as a module:
+        we only want its SQL_QUERIES mapping, not a registered module object.
+        """
+        code = compile(filepath.read_text(encoding="utf-8"), str(filepath), "exec")
+        file_namespace: Dict[str, Any] = {"__name__": filepath.stem, "__file__": str(filepath)}
+        exec(code, file_namespace)
+
+        # Every query file exposes its queries under the one agreed name
+        queries = file_namespace.get("SQL_QUERIES")
+        return queries if isinstance(queries, Mapping) else None
 
     @classmethod
-    def _load_queries_from_file(cls, filepath: str, module_name: str) -> None:
+    def _load_queries_from_file(cls, filepath: Path) -> None:
         """Helper to load queries from a single Python file."""
         try:
-            spec = importlib.util.spec_from_file_location(module_name, filepath)
-            if spec and spec.loader:
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-
-                # Look for a dictionary ending with _SQL_QUERIES in the module
-                for attr_name in dir(module):
-                    if attr_name.endswith("_SQL_QUERIES") and isinstance(getattr(module, attr_name), dict):
-                        # Store queries under a namespace based on the filename (e.g., 'user_360')
-                        namespace = os.path.splitext(os.path.basename(filepath))[0].replace("_queries", "")
-                        cls._all_queries[namespace] = getattr(module, attr_name)
-                        logger.info(f"Loaded queries from '{filepath}' under namespace '{namespace}'.")
-                        return
-                logger.warning(f"No SQL queries dictionary found in {filepath}. Expected a dict ending with '_SQL_QUERIES'.")
-            else:
-                logger.error(f"Could not load module spec or loader for {filepath}")
+            queries = cls._read_queries_file(filepath)
+            if queries is None:
+                logger.warning(f"No SQL queries dictionary found in {filepath}. Expected a 'SQL_QUERIES' mapping.")
+                return
+            namespace = cls._namespace_for(filepath)
+            cls._register_queries(namespace, queries)
+            logger.info(f"Loaded queries from '{filepath}' under namespace '{namespace}'.")
         except Exception as e:
             logger.error(f"Failed to load queries from {filepath}: {e}", exc_info=True)
             st.error(f"Error loading query file: {filepath}")
 
+    @classmethod
+    def _load_query_manifest(cls, base_dir: Path) -> bool:
+        """
+        Loads every namespace from the query manifest, if there is one and it is newer than all query files.
+        A stale or missing manifest is skipped; the files are then loaded one by one on first use.
+        """
+        manifest_path = base_dir / QUERY_MANIFEST_FILENAME
+        try:
+            manifest_mtime = manifest_path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+
+        if any(filepath.stat().st_mtime > manifest_mtime for filepath in _QUERY_FILE_PATHS.values()):
+            logger.warning(f"Query manifest '{manifest_path}' is older than the query files; ignoring it. Re-run scripts/build_query_manifest.py.")
+            return False
+
+        try:
+            manifest = json.loads(manifest_path.read_bytes())
+            for namespace, queries in manifest.items():
+                cls._register_queries(namespace, queries)
+        except Exception as e:
+            logger.error(f"Failed to load query manifest '{manifest_path}': {e}", exc_info=True)
+            return False
+        logger.info(f"Loaded {len(manifest)} query namespaces from manifest '{manifest_path}'.")
+        return True
+
+    @classmethod
+    def write_query_manifest(cls, base_dir: str) -> Path:
+        """
+        Extracts the SQL_QUERIES mapping of every query file in `base_dir` into a single JSON manifest.
+        Table names are left unbound so the manifest stays valid if config changes.
+        """
+        base_path = Path(base_dir)
+        manifest: Dict[str, Dict[str, str]] = {}
+        for filepath in sorted(base_path.glob("*.py")):
+            if filepath.name == "__init__.py":
+                continue
+            queries = cls._read_queries_file(filepath)
+            if queries is not None:
+                manifest[cls._namespace_for(filepath)] = dict(queries)
+
+        manifest_path = base_path / QUERY_MANIFEST_FILENAME
+        manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+        return manifest_path
+
     @classmethod
     def load_all_queries(cls):
         """
-        Loads all SQL queries from Python files in the configured queries directory.
-        This should be called once at application startup.
+        Eagerly loads all SQL queries from Python files in the configured queries directory.
+        Not needed for normal use, since get_query_text loads each file on first use.
         """
         if cls._queries_loaded:
             logger.info("Queries already loaded. Skipping re-load.")
@@ -70,34 +300,66 @@ class DataFetcher:
             st.error(f"Configuration Error: {error_msg}. Please set the correct path to your 'queries' folder.")
             return
 
-        for filename in os.listdir(cls._queries_base_dir):
-            if filename.endswith(".py") and filename != "__init__.py":
-                filepath = os.path.join(cls._queries_base_dir, filename)
-                module_name = os.path.splitext(filename)[0]
-                cls._load_queries_from_file(filepath, module_name)
+        def _read(filepath: Path) -> Tuple[Optional[Mapping[str, str]], Optional[Exception]]:
+            try:
+                return cls._read_queries_file(filepath), None
+            except Exception as e:
+                return None, e
+
+        with _QUERIES_LOCK:
+            pending = {namespace: filepath for namespace, filepath in _QUERY_FILE_PATHS.items() if namespace not in _ALL_QUERIES}
+            # Reading the files is I/O-bound, so read them concurrently; results are registered here,
+            # on the script thread, where st.error works.
+            with ThreadPoolExecutor(max_workers=max(1, min(8, len(pending), os.cpu_count() or 1))) as executor:
+                results = list(executor.map(_read, pending.values()))
+            for (namespace, filepath), (queries, error) in zip(pending.items(), results):
+                if error is not None:
+                    logger.error(f"Failed to load queries from {filepath}: {error}", exc_info=error)
+                    st.error(f"Error loading query file: {filepath}")
+                elif queries is None:
+                    logger.warning(f"No SQL queries dictionary found in {filepath}. Expected a 'SQL_QUERIES' mapping.")
+                else:
+                    cls._register_queries(namespace, queries)
+                    logger.info(f"Loaded queries from '{filepath}' under namespace '{namespace}'.")
 
         cls._queries_loaded = True
-        total_queries = sum(len(ns_queries) for ns_queries in cls._all_queries.values())
-        logger.info(f"Loaded {total_queries} SQL queries from {len(cls._all_queries)} namespaces.")
+        total_queries = sum(len(ns_queries) for ns_queries in _ALL_QUERIES.values())
+        logger.info(f"Loaded {total_queries} SQL queries from {len(_ALL_QUERIES)} namespaces.")
+
+    @classmethod
+    def _get_namespace_queries(cls, namespace: str) -> Optional[Mapping[str, str]]:
+        """Returns the queries of one namespace, loading its file on first use."""
+        namespace_queries = _ALL_QUERIES.get(namespace)
+        if namespace_queries is None and namespace in _QUERY_FILE_PATHS:
+            with _QUERIES_LOCK:
+                namespace_queries = _ALL_QUERIES.get(namespace) # Another session may have loaded it meanwhile
+                if namespace_queries is None:
+                    cls._load_queries_from_file(_QUERY_FILE_PATHS[namespace])
+                    namespace_queries = _ALL_QUERIES.get(namespace)
+        return namespace_queries
 
     @classmethod
     def get_query_text(cls, query_key: str) -> Optional[str]:
         """
-        Retrieves a SQL query string by its hierarchical key (e.g., "user_360.total_credit_usage").
+        Retrieves a SQL query string by its hierarchical key (e.g., "user_360.user_360_kpi_bundle").
         """
-        if not cls._queries_loaded:
-            cls.load_all_queries() # Attempt to load if not already loaded (useful for local dev)
-            if not cls._queries_loaded: # If still not loaded, something is wrong
-                return None
+        # Queries that are already loaded resolve with a single lookup on the full key
+        query_text = _QUERY_TEXTS.get(query_key)
+        if query_text is not None:
+            return query_text
 
-        parts = query_key.split('.')
-        if len(parts) != 2:
+        if not cls._queries_base_dir:
+            logger.error(f"Queries base directory not set; cannot resolve '{query_key}'.")
+            return None
+
+        parts = _split_query_key(query_key)
+        if parts is None:
             logger.error(f"Invalid query key format: '{query_key}'. Expected 'namespace.query_name'.")
             return None
         
         namespace, query_name = parts
         
-        namespace_queries = cls._all_queries.get(namespace)
+        namespace_queries = cls._get_namespace_queries(namespace)
         if not namespace_queries:
             logger.warning(f"Query namespace '{namespace}' not found for key '{query_key}'.")
             return None
@@ -108,78 +370,114 @@ class DataFetcher:
         return query_text
 
     @staticmethod
-    @st.cache_data(ttl=3600, show_spinner="Fetching data from Snowflake...") # Cache for 1 hour
-    @handle_errors # Use the utility decorator for broader error handling
+    def _prepare_query(query_text: str, params: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Any]]:
+        """
+        Turns a loaded query into SQL with '?' bind markers plus the bind values, in order.
+        Dates and user names never end up in the SQL text itself, so the text stays the
+        same across filter selections and Snowflake can reuse its compiled plan.
+        """
+        compiled = _compile_query(query_text)
+        params = params or {}
+        bind_params: List[Any] = [] # For Snowpark's `params` argument
+        clause_values: Dict[str, str] = {}
+
+        for placeholder in compiled.placeholders:
+            if placeholder in _FILTER_CLAUSES:
+                # Optional filters expand to a clause with its own bind marker, or to nothing.
+                param_key, clause = _FILTER_CLAUSES[placeholder]
+                if params.get(param_key) is not None:
+                    clause_values[placeholder] = clause
+                    bind_params.append(params[param_key])
+                else:
+                    clause_values[placeholder] = ""
+            elif params.get(placeholder) is not None:
+                bind_params.append(params[placeholder]) # Dates are 'YYYY-MM-DD' strings from FilterManager
+            else:
+                raise ValueError(f"Missing value for query parameter '{placeholder}'.")
+
+        # Add more dynamic filter clauses to _FILTER_CLAUSES as needed for other dimensions
+        # e.g., warehouse, database, etc., always using '?' so the value is bound.
+        final_sql = "".join(
+            literal_text + (clause_values[field_name] if field_name is not None else "")
+            for literal_text, field_name in compiled.segments
+        )
+        return final_sql, bind_params
+
+    @staticmethod
+    def _fetch_pandas_via_connector(session: Session, sql: str, bind_params: List[Any]) -> pd.DataFrame:
+        """
+        Runs a read-only query on the session's underlying connector connection and decodes
+        the Arrow result chunks directly into pandas, skipping Snowpark's DataFrame layer.
+        Reuses the session's connection, so there is no second login.
+        """
+        with session.connection.cursor() as cursor:
+            cursor.execute(sql, bind_params)
+            return cursor.fetch_pandas_all()
+
+    @staticmethod
+    def _run_query_to_pandas(session: Session, final_sql: str, bind_params: List[Any]) -> pd.DataFrame:
+        """Executes prepared SQL on the path selected by USE_CONNECTOR_FAST_PATH and returns a compacted DataFrame."""
+        if USE_CONNECTOR_FAST_PATH:
+            df = DataFetcher._fetch_pandas_via_connector(session, final_sql, bind_params)
+        else:
+            # Execute the prepared SQL with bind parameters and convert to pandas for Streamlit and Plotly
+            df = session.sql(final_sql, params=bind_params).to_pandas()
+        return _categorize_text_columns(_downcast_numeric_columns(df))
+
+    @staticmethod
+    @st.cache_resource(ttl=600, show_spinner=False) # Cache for 10 minutes; pages render their own spinners
     def _execute_snowpark_query_cached(
-        session: Session, 
-        query_text: str, 
-        params: Optional[Dict[str, Any]] = None,
-        query_key_for_logging: str = "unknown_query" # For better error messages
+        _session: Session, 
+        query_key: str,
+        params_key: str,
+        _query_text: str,
+        _params: Optional[Dict[str, Any]] = None
     ) -> pd.DataFrame:
         """
         Internal method to execute a Snowpark query and cache its result.
         Handles dynamic query construction and parameterized execution for security.
+        Errors propagate to fetch_data, which reports them; a failed query is therefore never
+        cached, and the next rerun tries it again.
+
+        Cached with st.cache_resource rather than st.cache_data: every hit returns the same
+        DataFrame instead of unpickling a fresh copy of it. fetch_data hands each caller its
+        own shallow copy, so adding, replacing or dropping columns never reaches the cache.
+
+        The cache is keyed on the query key and `params_key` (the params serialized by
+        _params_cache_key) only. Leading underscores tell Streamlit not to hash `_session`,
+        the (multi-KB) `_query_text`, which is fixed per key, or the `_params` dict,
+        so cache hits don't re-hash the SQL or walk the params on every rerun.
         """
-        logger.info(f"Executing query '{query_key_for_logging}' (cached): {query_text[:100].replace('\n', ' ')}...")
-        
-        # Start with the base query text
-        final_sql = query_text
-        bind_params: List[Any] = [] # For Snowpark's `binds` parameter
-
-        # 1. Handle common table placeholders
-        # These are direct string replacements, assuming they come from trusted config.
-        final_sql = final_sql.replace("{query_history_table}", QUERY_HISTORY_TABLE)
-        final_sql = final_sql.replace("{metering_history_table}", METERING_HISTORY_TABLE)
-        final_sql = final_sql.replace("{login_history_table}", LOGIN_HISTORY_TABLE)
-        final_sql = final_sql.replace("{warehouse_metering_history_table}", WAREHOUSE_METERING_HISTORY_TABLE)
-        
-        # 2. Handle date placeholders (e.g., '{start_date}', '{end_date}')
-        # These are also direct string replacements, wrapped in quotes for SQL strings.
-        # Dates come from controlled Streamlit date inputs, so this is generally safe.
-        if params:
-            for date_param_key in ["start_date", "end_date", "prev_start_date", "prev_end_date"]:
-                if date_param_key in params and params[date_param_key] is not None:
-                    # Ensure the date is formatted as 'YYYY-MM-DD' before inserting
-                    formatted_date = params[date_param_key] # Expecting string already from FilterManager
-                    final_sql = final_sql.replace(f"'{'{'}{date_param_key}{'}'}'", f"'{formatted_date}'")
-                    # Note: The query should have {start_date} as '{start_date}' for this to work.
-                    # Or, adjust: final_sql = final_sql.replace("{" + date_param_key + "}", f"'{params[date_param_key]}'")
-                    # The latter is safer if you use {start_date} without quotes in the SQL.
-                    # Let's assume the SQL has '{start_date}' as per user_360_queries.py
-        
-            # 3. Handle specific parameterized clauses (e.g., user_name)
-            # This is where we prevent SQL injection for dynamic, user-controlled strings.
-            # We'll replace the `{user_name_filter_clause}` placeholder in the SQL
-            # with `AND user_name = ?` and add the actual value to `bind_params`.
-            user_filter_clause = ""
-            if 'user_name' in params and params['user_name'] is not None:
-                user_filter_clause = "AND user_name = ?"
-                bind_params.append(params['user_name'])
-            
-            final_sql = final_sql.replace("{user_name_filter_clause}", user_filter_clause)
-            
-            # Add more dynamic filter clauses here as needed for other dimensions
-            # e.g., warehouse, database, etc., always using '?' and adding to bind_params.
+        query_text = _query_text
+        query_preview = query_text[:100].replace("\n", " ")
+        logger.info(f"Executing query '{query_key}' (cached): {query_preview}...")
 
+        final_sql, bind_params = DataFetcher._prepare_query(query_text, _params)
+        df = DataFetcher._run_query_to_pandas(_session, final_sql, bind_params)
 
-        try:
-            # Execute the prepared SQL with parameters
-            snowpark_df = session.sql(final_sql, binds=bind_params)
-            
-            # Convert to pandas DataFrame for Streamlit and Plotly compatibility
-            df = snowpark_df.to_pandas()
-
-            logger.info(f"Query '{query_key_for_logging}' executed successfully. Rows: {len(df)}")
-            return df
-        except SnowparkSQLException as e:
-            error_detail = f"SQL State: {e.sqlstate}, Error Code: {e.error_code}, Message: {e.message}"
-            logger.error(f"Snowpark SQL Error for '{query_key_for_logging}': {error_detail}\nQuery: {final_sql}", exc_info=True)
-            st.error(f"🚨 **Database Error** for '{query_key_for_logging}': <br>_{e.message}_", unsafe_allow_html=True)
-            return pd.DataFrame() # Return empty DataFrame on SQL error
-        except Exception as e:
-            logger.error(f"Unexpected error executing query '{query_key_for_logging}': {e}", exc_info=True)
-            st.error(f"❌ **An unexpected error occurred** while fetching data for '{query_key_for_logging}'. <br>_{e}_", unsafe_allow_html=True)
-            return pd.DataFrame() # Return empty DataFrame on generic error
+        logger.info(f"Query '{query_key}' executed successfully. Rows: {len(df)}")
+        return df
+
+    @staticmethod
+    @st.cache_data(ttl=600, show_spinner=False)
+    def _execute_scalar_query_cached(
+        _session: Session,
+        query_key: str,
+        params_key: str,
+        _query_text: str,
+        _params: Optional[Dict[str, Any]] = None
+    ) -> Optional[Any]:
+        """
+        Executes a single-value metric query and caches the value.
+        Uses Snowpark's first(), which fetches one row only, so no DataFrame or Arrow
+        buffers are built for what is a single scalar. Cached on the same key as
+        _execute_snowpark_query_cached.
+        Errors propagate to fetch_metric_value, which reports them, so a failure is never cached.
+        """
+        final_sql, bind_params = DataFetcher._prepare_query(_query_text, _params)
+        row = _session.sql(final_sql, params=bind_params).first()
+        logger.info(f"Metric query '{query_key}' executed successfully.")
+        return row[0] if row is not None and len(row) > 0 else None
 
     @classmethod
     def fetch_data(
@@ -190,7 +488,9 @@ class DataFetcher:
     ) -> pd.DataFrame:
         """
         Public method to fetch data using a stored query key and parameters.
-        Returns a pandas DataFrame.
+        Returns a shallow copy of the cached DataFrame: columns may be added, replaced or dropped
+        freely, but the underlying arrays are shared with other callers, so don't write into them.
+        Errors are reported here and yield an empty DataFrame, which is not cached.
         """
         query_text = cls.get_query_text(query_key)
         if not query_text:
@@ -198,8 +498,18 @@ class DataFetcher:
             return pd.DataFrame()
 
         # Call the cached execution method
-        df = cls._execute_snowpark_query_cached(session, query_text, params, query_key_for_logging=query_key)
-        return df
+        try:
+            df = cls._execute_snowpark_query_cached(session, query_key, _params_cache_key(params), query_text, params)
+        except SnowparkSQLException as e:
+            error_detail = f"SQL State: {e.sqlstate}, Error Code: {e.error_code}, Message: {e.message}"
+            logger.error(f"Snowpark SQL Error for '{query_key}': {error_detail}", exc_info=True)
+            st.error(f"🚨 **Database Error** for '{query_key}': <br>_{e.message}_", unsafe_allow_html=True)
+            return pd.DataFrame() # Return empty DataFrame on SQL error
+        except Exception as e:
+            logger.error(f"Unexpected error executing query '{query_key}': {e}", exc_info=True)
+            st.error(f"❌ **An unexpected error occurred** while fetching data for '{query_key}'. <br>_{e}_", unsafe_allow_html=True)
+            return pd.DataFrame() # Return empty DataFrame on generic error
+        return df.copy(deep=False) # New column index per caller; the column arrays stay shared
 
     @classmethod
     def fetch_metric_value(
@@ -212,8 +522,67 @@ class DataFetcher:
         Fetches data for a metric (expected to return a single value).
         Returns the first value from the first row/column.
         """
-        df = cls.fetch_data(session, query_key, params)
-        if not df.empty and len(df.columns) > 0:
-            return df.iloc[0, 0]
-        logger.warning(f"No data or empty DataFrame returned for metric query: {query_key}")
-        return None
\ No newline at end of file
+        query_text = cls.get_query_text(query_key)
+        if not query_text:
+            st.error(f"Failed to retrieve query text for '{query_key}'. Data cannot be fetched.")
+            return None
+
+        try:
+            value = cls._execute_scalar_query_cached(session, query_key, _params_cache_key(params), query_text, params)
+        except SnowparkSQLException as e:
+            error_detail = f"SQL State: {e.sqlstate}, Error Code: {e.error_code}, Message: {e.message}"
+            logger.error(f"Snowpark SQL Error for '{query_key}': {error_detail}", exc_info=True)
+            st.error(f"🚨 **Database Error** for '{query_key}': <br>_{e.message}_", unsafe_allow_html=True)
+            return None # Not cached; the next rerun tries the query again
+        except Exception as e:
+            logger.error(f"Unexpected error executing metric query '{query_key}': {e}", exc_info=True)
+            st.error(f"❌ **An unexpected error occurred** while fetching data for '{query_key}'. <br>_{e}_", unsafe_allow_html=True)
+            return None
+        if value is not None:
+            return value
+        logger.warning(f"No data returned for metric query: {query_key}")
+        return None
+
+    @classmethod
+    def submit_many(
+        cls,
+        session: Session,
+        requests: Dict[str, Tuple[str, Optional[Dict[str, Any]]]],
+        metric_names: Collection[str] = ()
+    ) -> Dict[str, "Future[Any]"]:
+        """
+        Starts several independent queries concurrently without waiting for them.
+        Takes the same arguments as fetch_many and returns a future per name, so a page can submit
+        everything up front and call .result() at the point where each section renders.
+        """
+        # Worker threads need the script run context for st.cache_data and st.error to work.
+        ctx = get_script_run_ctx()
+
+        def _fetch(name: str, query_key: str, params: Optional[Dict[str, Any]]) -> Any:
+            add_script_run_ctx(threading.current_thread(), ctx)
+            if name in metric_names:
+                return cls.fetch_metric_value(session, query_key, params)
+            return cls.fetch_data(session, query_key, params)
+
+        executor = _get_query_executor()
+        return {
+            name: executor.submit(_fetch, name, query_key, params)
+            for name, (query_key, params) in requests.items()
+        }
+
+    @classmethod
+    def fetch_many(
+        cls,
+        session: Session,
+        requests: Dict[str, Tuple[str, Optional[Dict[str, Any]]]],
+        metric_names: Collection[str] = ()
+    ) -> Dict[str, Any]:
+        """
+        Fetches several independent queries concurrently.
+        `requests` maps a result name to a (query_key, params) pair; results come back under the same names.
+        Names listed in `metric_names` are fetched with fetch_metric_value and come back as single values;
+        all others come back as DataFrames from fetch_data.
+        Page wall-clock becomes the slowest query rather than the sum of all of them.
+        """
+        futures = cls.submit_many(session, requests, metric_names)
+        return {name: future.result() for name, future in futures.items()}
@@ -1,16 +1,51 @@
 # finops_dashboard/src/data_processor.py
 
+from functools import lru_cache
+import numpy as np
 import pandas as pd
-from typing import Optional, Union, Dict, Any
+import streamlit as st
+from typing import Optional, Sequence, Tuple, Union, Dict, Any
 import logging
 
 # Import utilities for error handling
 from src.utils import handle_errors
 # Import config for priority levels or other thresholds
-from src.config import PRIORITY_LEVELS
+from src.config import PRIORITY_STYLES, Priority
 
 logger = logging.getLogger(__name__)
 
+def _as_numeric(series: pd.Series, fill_value: Union[int, float] = 0) -> pd.Series:
+    """
+    Coerces a column to numbers, filling missing or unparseable values with fill_value.
+    Columns Snowflake already returned as numbers are passed through without a copy.
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.fillna(fill_value) if series.hasnans else series
+    return pd.to_numeric(series, errors='coerce').fillna(fill_value)
+
+@lru_cache(maxsize=16)
+def _cached_empty_frame(columns: Tuple[Tuple[str, str], ...]) -> pd.DataFrame:
+    return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in columns})
+
+def _empty_frame(**columns: str) -> pd.DataFrame:
+    """
+    Returns an empty DataFrame with the given column -> dtype schema. The frame is built once per
+    schema; callers get a shallow copy so adding columns to it can't leak into the cached one.
+    """
+    return _cached_empty_frame(tuple(columns.items())).copy(deep=False)
+
+# Categorical dtypes of the PRIORITY_* columns, indexed by Priority code; built once at import
+_PRIORITY_COLUMN_DTYPES: Dict[str, pd.CategoricalDtype] = {
+    column: pd.CategoricalDtype([getattr(style, attribute) for style in PRIORITY_STYLES], ordered=True)
+    for column, attribute in (
+        ('PRIORITY_LEVEL', 'key'),
+        ('PRIORITY_LABEL', 'label'),
+        ('PRIORITY_BG_COLOR', 'bg_color'),
+        ('PRIORITY_TEXT_COLOR', 'text_color'),
+        ('PRIORITY_ICON', 'icon'),
+    )
+}
+
 class DataProcessor:
     """
     Handles post-query data manipulation, transformations, and business logic.
@@ -18,7 +53,6 @@ class DataProcessor:
     """
 
     @staticmethod
-    @handle_errors
     def calculate_percentage_delta(current_value: Optional[Union[int, float]], previous_value: Optional[Union[int, float]]) -> Optional[str]:
         """
         Calculates the percentage change between two values.
@@ -41,7 +75,6 @@ class DataProcessor:
         return f"{sign}{delta:.1f}%"
 
     @staticmethod
-    @handle_errors
     def determine_delta_color(current_value: Optional[Union[int, float]], previous_value: Optional[Union[int, float]], higher_is_better: bool = False) -> str:
         """
         Determines the appropriate delta color ('normal', 'inverse', 'off') for Streamlit metrics.
@@ -62,6 +95,54 @@ class DataProcessor:
         else: # current_value < previous_value
             return "normal" if not higher_is_better else "inverse" # 'inverse' means red for positive change
 
+    @staticmethod
+    def calculate_percentage_delta_vec(
+        current_values: Union[Sequence[Optional[float]], np.ndarray, pd.Series],
+        previous_values: Union[Sequence[Optional[float]], np.ndarray, pd.Series]
+    ) -> np.ndarray:
+        """
+        Array version of calculate_percentage_delta: computes the deltas for a whole batch of
+        metric cards in one pass. Returns an object array of the same strings (None where
+        either value is missing, "N/A" where only the previous value is zero).
+        """
+        current = np.asarray(current_values, dtype=np.float64) # None becomes NaN
+        previous = np.asarray(previous_values, dtype=np.float64)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            delta = (current - previous) / np.where(previous == 0, 1.0, previous) * 100 + 0.0 # + 0.0 folds -0.0 into 0.0
+
+        missing = np.isnan(current) | np.isnan(previous)
+        zero_previous = previous == 0
+        formatted = np.array([f"{value:+.1f}%" for value in delta.tolist()], dtype=object)
+        return np.select(
+            [missing, zero_previous & (current == 0), zero_previous],
+            [None, "0.0%", "N/A"],
+            default=formatted
+        )
+
+    @staticmethod
+    def determine_delta_color_vec(
+        current_values: Union[Sequence[Optional[float]], np.ndarray, pd.Series],
+        previous_values: Union[Sequence[Optional[float]], np.ndarray, pd.Series],
+        higher_is_better: Union[bool, Sequence[bool], np.ndarray] = False
+    ) -> np.ndarray:
+        """
+        Array version of determine_delta_color. `higher_is_better` may be a single flag or one per value.
+        Returns an object array of 'normal' / 'inverse' / 'off'.
+        """
+        current = np.asarray(current_values, dtype=np.float64)
+        previous = np.asarray(previous_values, dtype=np.float64)
+        higher_is_better = np.asarray(higher_is_better, dtype=bool)
+
+        # NaN comparisons are False, so missing values fall through to 'off' like equal ones
+        increased = current > previous
+        decreased = current < previous
+        return np.select(
+            [(increased & higher_is_better) | (decreased & ~higher_is_better), increased | decreased],
+            ["normal", "inverse"],
+            default="off"
+        ).astype(object)
+
 
     @staticmethod
     @handle_errors
@@ -88,23 +169,28 @@ class DataProcessor:
         """
         if df.empty:
             logger.warning("Input DataFrame for pivot_for_heatmap is empty.")
-            return pd.DataFrame()
+            return _empty_frame()
             
         required_cols = [index_col, columns_col, values_col]
         if not all(col in df.columns for col in required_cols):
             logger.error(f"Missing required columns for pivot: {', '.join([col for col in required_cols if col not in df.columns])}")
             st.error(f"Error: Missing columns for heatmap data ({index_col}, {columns_col}, {values_col}).")
-            return pd.DataFrame()
+            return _empty_frame()
 
         try:
             # Ensure the values column is numeric
-            df[values_col] = pd.to_numeric(df[values_col], errors='coerce').fillna(fill_value)
+            raw_values = df[values_col]
+            values = _as_numeric(raw_values, fill_value)
+            if values is not raw_values: # Copy the frame only when the column actually changed
+                df = df.assign(**{values_col: values})
             
-            pivot_df = df.pivot_table(
-                index=index_col, 
-                columns=columns_col, 
-                values=values_col,
-                fill_value=fill_value # Fill NaN during pivot
+            # groupby + unstack only materializes the (index, column) pairs present in the data
+            # and fills the gaps while unstacking, where pivot_table builds the dense grid first.
+            # The mean matches pivot_table's default aggregation.
+            pivot_df = (
+                df.groupby([index_col, columns_col], observed=True)[values_col]
+                .mean()
+                .unstack(fill_value=fill_value)
             )
             # Ensure column order if needed (e.g., for hours 0-23)
             if columns_col == 'QUERY_HOUR' and all(col in pivot_df.columns for col in range(24)):
@@ -114,11 +200,11 @@ class DataProcessor:
         except KeyError as e:
             logger.error(f"KeyError during pivot for heatmap: {e}. Check column names and data.", exc_info=True)
             st.error(f"Error pivoting data for heatmap. Check column names.")
-            return pd.DataFrame()
+            return _empty_frame()
         except Exception as e:
             logger.error(f"Error pivoting DataFrame for heatmap: {e}", exc_info=True)
             st.error(f"An unexpected error occurred during data pivoting: {e}")
-            return pd.DataFrame()
+            return _empty_frame()
 
     @staticmethod
     @handle_errors
@@ -139,42 +225,41 @@ class DataProcessor:
             avg_cost_threshold_multiplier (float): Multiplier for average cost to determine 'Medium Priority'.
 
         Returns:
-            pd.DataFrame: Original DataFrame with added 'PRIORITY_LEVEL', 'PRIORITY_LABEL',
-                          'PRIORITY_BG_COLOR', 'PRIORITY_TEXT_COLOR' columns.
+            pd.DataFrame: A new DataFrame with the original columns plus 'PRIORITY_LEVEL', 'PRIORITY_LABEL',
+                          'PRIORITY_BG_COLOR', 'PRIORITY_TEXT_COLOR', 'PRIORITY_ICON' columns.
         """
         if df.empty or cost_column not in df.columns or user_column not in df.columns:
             logger.warning(f"Input DataFrame empty or missing required columns for high impact user identification: {user_column}, {cost_column}.")
             return df # Return original if missing data/columns
 
-        # Ensure cost column is numeric before calculating mean
-        df[cost_column] = pd.to_numeric(df[cost_column], errors='coerce').fillna(0)
+        # Ensure cost column is numeric before calculating mean (kept as an array; the caller's frame is not modified)
+        costs = _as_numeric(df[cost_column]).to_numpy()
         
-        avg_cost = df[cost_column].mean()
+        avg_cost = costs.mean()
         
-        # Assign priority levels based on thresholds defined here
+        # Assign priority levels based on thresholds defined here, as Priority codes for the whole column at once.
         # These map directly to keys in PRIORITY_LEVELS from config.py
-        def assign_priority(row_cost):
-            if avg_cost == 0: # Avoid division by zero, or if all costs are zero
-                return "Good Performance"
-            if row_cost > avg_cost * 2:
-                return "High Priority"
-            elif row_cost > avg_cost * avg_cost_threshold_multiplier:
-                return "Medium Priority"
-            elif row_cost > avg_cost:
-                return "Above Avg Cost"
-            else:
-                return "Good Performance"
-
-        df['PRIORITY_LEVEL'] = df[cost_column].apply(assign_priority)
-        
-        # Add details from config for display in UIComponents
-        df['PRIORITY_LABEL'] = df['PRIORITY_LEVEL'].apply(lambda x: PRIORITY_LEVELS.get(x, PRIORITY_LEVELS["N/A"]).get('label', x))
-        df['PRIORITY_BG_COLOR'] = df['PRIORITY_LEVEL'].apply(lambda x: PRIORITY_LEVELS.get(x, PRIORITY_LEVELS["N/A"]).get('bg_color', ''))
-        df['PRIORITY_TEXT_COLOR'] = df['PRIORITY_LEVEL'].apply(lambda x: PRIORITY_LEVELS.get(x, PRIORITY_LEVELS["N/A"]).get('text_color', ''))
-        df['PRIORITY_ICON'] = df['PRIORITY_LEVEL'].apply(lambda x: PRIORITY_LEVELS.get(x, PRIORITY_LEVELS["N/A"]).get('icon', ''))
-
+        if avg_cost == 0: # Avoid division by zero, or if all costs are zero
+            priority_codes = np.full(len(costs), Priority.GOOD, dtype=np.int8)
+        elif avg_cost > 0 and 1 <= avg_cost_threshold_multiplier <= 2:
+            # With ascending thresholds, one digitize pass counts how many each cost strictly exceeds
+            # (right=True keeps the comparisons strict): 0 -> GOOD ... 3 -> HIGH
+            exceeded = np.digitize(costs, [avg_cost, avg_cost * avg_cost_threshold_multiplier, avg_cost * 2], right=True)
+            priority_codes = (Priority.GOOD - exceeded).astype(np.int8)
+        else: # Thresholds out of order; np.select picks the first matching condition, like an if/elif chain
+            priority_codes = np.select(
+                [costs > avg_cost * 2, costs > avg_cost * avg_cost_threshold_multiplier, costs > avg_cost],
+                [Priority.HIGH, Priority.MEDIUM, Priority.ABOVE_AVG],
+                default=Priority.GOOD
+            )
 
-        return df
+        # Return a new frame: the original columns plus the new columns, with no separate copy step.
+        # Details come from config for display in UIComponents. Each column is categorical, built straight
+        # from the Priority codes: one small code per row instead of a repeated Python string.
+        return df.assign(**{cost_column: costs}, **{
+            column: pd.Categorical.from_codes(priority_codes, dtype=dtype)
+            for column, dtype in _PRIORITY_COLUMN_DTYPES.items()
+        })
 
     @staticmethod
     @handle_errors
@@ -189,29 +274,34 @@ class DataProcessor:
             n (int): Number of top items to include before 'Others'.
             
         Returns:
-            pd.DataFrame: DataFrame with top N items and an 'Others' row. Returns empty DataFrame on error.
+            pd.DataFrame: DataFrame of name_col and value_col with the top N items and an 'Others' row.
+                Returns empty DataFrame on error.
         """
         if df.empty or value_col not in df.columns or name_col not in df.columns:
             logger.warning(f"Input DataFrame empty or missing required columns for top N values: {value_col}, {name_col}.")
-            return pd.DataFrame()
+            return _empty_frame(**{name_col: 'object', value_col: 'float64'})
 
-        # Ensure value column is numeric
-        df[value_col] = pd.to_numeric(df[value_col], errors='coerce').fillna(0)
+        # Ensure value column is numeric, without writing back into the caller's frame
+        values_all = _as_numeric(df[value_col]).to_numpy(dtype=np.float64)
+        names_all = df[name_col].to_numpy()
 
-        df_sorted = df.sort_values(by=value_col, ascending=False).reset_index(drop=True)
-        
-        if len(df_sorted) <= n:
-            return df_sorted
-        
-        top_n = df_sorted.head(n)
-        others_sum = df_sorted.iloc[n:][value_col].sum()
-        
-        # Create a DataFrame for 'Others'
-        # Ensure the column names match
-        others_data = {name_col: 'Others', value_col: others_sum}
-        # Add other columns from the original DataFrame if they are relevant and can be aggregated or defaulted
-        # For simplicity, we only include the name_col and value_col.
-        
-        others_df = pd.DataFrame([others_data])
-        
-        return pd.concat([top_n, others_df], ignore_index=True)
\ No newline at end of file
+        k = max(0, min(n, len(values_all)))
+        if k < len(values_all):
+            # Partial selection of the top K, then sort only those K values
+            top_idx = np.argpartition(-values_all, k - 1)[:k] if k else np.empty(0, dtype=np.intp)
+        else:
+            top_idx = np.arange(k)
+        top_idx = top_idx[np.argsort(-values_all[top_idx], kind='stable')]
+
+        if len(values_all) <= n:
+            return pd.DataFrame({name_col: names_all[top_idx], value_col: values_all[top_idx]})
+
+        # Preallocate the top K rows plus the 'Others' row and fill in place
+        names = np.empty(k + 1, dtype=object)
+        values = np.empty(k + 1, dtype=np.float64)
+        names[:k] = names_all[top_idx]
+        values[:k] = values_all[top_idx]
+        names[-1] = 'Others'
+        values[-1] = values_all.sum() - values[:k].sum()
+
+        return pd.DataFrame({name_col: names, value_col: values})
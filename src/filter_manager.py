@@ -1,21 +1,23 @@
 # finops_dashboard/src/filter_manager.py
 
 from datetime import datetime, timedelta
-from typing import Tuple, Optional, List
+from typing import TYPE_CHECKING, Any, Dict, Tuple, Optional
 import streamlit as st
-from snowflake.snowpark import Session
 import logging
 
 # Import constants and utilities
 from src.config import DATE_RANGES, DEFAULT_DATE_RANGE_INDEX
 from src.utils import handle_errors
-# Import DataFetcher (we'll need it to get the list of users)
-from src.data_fetcher import DataFetcher # This will cause a circular import if DataFetcher imports FilterManager.
-                                         # We'll address this by passing session/querying users directly here
-                                         # or by ensuring DataFetcher is only imported later for data fetching.
+# DataFetcher is not imported here: the user list is queried directly on the session, which also
+# avoids a circular import should DataFetcher ever need FilterManager.
+
+if TYPE_CHECKING: # Only needed for type hints; keeps Snowpark off the import path of this module
+    from snowflake.snowpark import Session
 
 logger = logging.getLogger(__name__)
 
+ALL_USERS_OPTION = "All Users" # First entry of the user filter; selecting it means no user filter
+
 class FilterManager:
     """
     Manages date and user filters for the dashboard.
@@ -68,50 +70,53 @@ class FilterManager:
         return start_date_str, end_date_str
 
     @staticmethod
-    @handle_errors
-    @st.cache_data(ttl=3600) # Cache the list of users for 1 hour
-    def _get_cached_users_list(session: Session) -> List[str]:
+    @st.cache_resource(ttl=24 * 3600, show_spinner=False) # The user list changes rarely; cache it for a day
+    def _get_cached_user_options(_session: "Session") -> Tuple[str, ...]:
         """
-        Fetches and caches the list of distinct users from Snowflake.
+        Fetches and caches the user filter options: "All Users" followed by every user (not deleted).
         This is an internal helper to avoid re-fetching the list constantly.
+        The leading underscore keeps Streamlit from trying to hash the session.
+
+        Cached as a shared resource rather than with st.cache_data, which would unpickle a fresh
+        copy of the whole list on every rerun; the result is an immutable tuple, so sharing it is safe.
+        Errors are raised rather than returned so that a failed lookup is not cached.
         """
         logger.info("Fetching distinct user list from Snowflake...")
-        try:
-            # Directly execute a simple query to get users for the filter
-            # We avoid using DataFetcher.fetch_data here to prevent circular dependency
-            # if DataFetcher itself needs FilterManager (which it doesn't, but common pattern)
-            # and to keep this specific lookup simple.
-            
-            # Use a raw SQL query from common_queries, making sure to replace table placeholder
-            from queries.common_queries import COMMON_SQL_QUERIES
-            from src.config import QUERY_HISTORY_TABLE # Ensure table name is from config
+        # Directly execute a simple query to get users for the filter
+        # We avoid using DataFetcher.fetch_data here to prevent circular dependency
+        # if DataFetcher itself needs FilterManager (which it doesn't, but common pattern)
+        # and to keep this specific lookup simple.
+        
+        # Use a raw SQL query from common_queries, making sure to replace table placeholder
+        from queries.common_queries import COMMON_SQL_QUERIES
+        from src.config import USERS_TABLE # Ensure table name is from config
 
-            query_text = COMMON_SQL_QUERIES["get_distinct_users_30_days"].format(query_history_table=QUERY_HISTORY_TABLE)
-            
-            # Execute with Snowpark session
-            result = session.sql(query_text).collect()
-            users = sorted([row[0] for row in result if row[0]]) # Filter out None/empty strings
-            logger.info(f"Fetched {len(users)} distinct users.")
-            return users
-        except Exception as e:
-            logger.error(f"Error fetching users for filter: {e}", exc_info=True)
-            st.error(f"Failed to load user list for filter: {str(e)}")
-            return []
+        query_text = COMMON_SQL_QUERIES["get_all_users"].format(users_table=USERS_TABLE)
+        
+        # Execute with Snowpark session; to_pandas() decodes the Arrow result directly
+        # instead of building a Python Row object per user like collect() does.
+        # The query returns just the one name column, already sorted.
+        users_df = _session.sql(query_text).to_pandas()
+        users = [user for user in users_df.iloc[:, 0].tolist() if user] # Filter out None/empty strings
+        logger.info(f"Fetched {len(users)} distinct users.")
+        return (ALL_USERS_OPTION, *users)
 
     @staticmethod
     @handle_errors
-    def get_user_filter(session: Session) -> Optional[str]:
+    def get_user_filter(session: "Session") -> Optional[str]:
         """
         Renders the user filter UI and returns the selected user name.
         Returns None if 'All Users' is selected.
         """
         st.subheader("User Selection")
         
-        # Use the cached helper to get the user list
-        users = FilterManager._get_cached_users_list(session)
-        
-        # Add "All Users" option
-        options = ["All Users"] + users
+        # Use the cached helper to get the user list, "All Users" option included
+        try:
+            options = FilterManager._get_cached_user_options(session)
+        except Exception as e:
+            logger.error(f"Error fetching users for filter: {e}", exc_info=True)
+            st.error(f"Failed to load user list for filter: {str(e)}")
+            options = (ALL_USERS_OPTION,)
 
         selected_user = st.selectbox(
             "👤 Select User",
@@ -120,10 +125,10 @@ class FilterManager:
             help="Filter data by a specific Snowflake user. 'All Users' shows aggregated data."
         )
 
-        return None if selected_user == "All Users" else selected_user
+        return None if selected_user == ALL_USERS_OPTION else selected_user
 
     @staticmethod
-    def get_time_and_user_filters(session: Session) -> Dict[str, Any]:
+    def get_time_and_user_filters(session: "Session") -> Dict[str, Any]:
         """
         A convenience method to get all standard filters in one call.
         Returns a dictionary suitable for passing to DataFetcher.
@@ -2,15 +2,26 @@
 
 import streamlit as st
 import logging
-from typing import Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 # Import utilities and configuration
 from src.utils import handle_errors
-from src.config import METRIC_FORMATS # For consistent number formatting
+from src.config import METRIC_FORMATS, MetricFormat # For consistent number formatting
 from src.data_processor import DataProcessor # For delta calculation and color
 
 logger = logging.getLogger(__name__)
 
+def _make_value_formatter(metric_format: MetricFormat) -> Callable[[Union[int, float]], str]:
+    """Compiles a metric format into one bound str.format call, e.g. "$" + "{:,.2f}" + ""."""
+    number_spec = f"{{:{',' if metric_format.thousands_sep else ''}.{metric_format.decimals}f}}"
+    escape = lambda text: text.replace("{", "{{").replace("}", "}}")
+    return (escape(metric_format.prefix) + number_spec + escape(metric_format.suffix)).format
+
+# One precompiled formatter per metric type, built once at import
+_VALUE_FORMATTERS: Dict[str, Callable[[Union[int, float]], str]] = {
+    metric_type: _make_value_formatter(metric_format) for metric_type, metric_format in METRIC_FORMATS.items()
+}
+
 class MetricBuilder:
     """
     Responsible for rendering Streamlit metric cards with consistent formatting
@@ -19,6 +30,64 @@ class MetricBuilder:
 
     @staticmethod
     @handle_errors
+    def build_metric_grid(specs: List[Dict[str, Any]], num_columns: Optional[int] = None):
+        """
+        Builds and displays a batch of Streamlit metric cards, computing all deltas and colors in one
+        vectorized pass instead of once per card.
+
+        Args:
+            specs (List[Dict[str, Any]]): One dict per card, keyed like the arguments of build_metric_card
+                                          ('label' and 'current_value' are required, the rest are optional).
+            num_columns (Optional[int]): If given, lays the cards out in rows of this many st.columns.
+                                         Otherwise the cards are rendered into the current container.
+        """
+        if not specs:
+            return
+
+        current_values = [spec.get("current_value") for spec in specs]
+        previous_values = [spec.get("previous_value") for spec in specs]
+        has_previous = [value is not None for value in previous_values]
+
+        # One shared numpy conversion for the whole batch (None becomes NaN)
+        deltas = DataProcessor.calculate_percentage_delta_vec(current_values, previous_values)
+        delta_colors = DataProcessor.determine_delta_color_vec(
+            current_values, previous_values,
+            higher_is_better=[spec.get("higher_is_better_for_delta", True) for spec in specs]
+        )
+
+        containers = st.columns(num_columns) if num_columns else None
+        for i, spec in enumerate(specs):
+            label = spec["label"]
+            current_value = current_values[i]
+
+            # Format current value with the precompiled formatter for this metric type
+            if current_value is None:
+                formatted_value = "N/A"
+                logger.debug(f"Metric '{label}': Current value is None.")
+            else:
+                format_value = _VALUE_FORMATTERS.get(spec.get("metric_type", "number"), _VALUE_FORMATTERS["number"])
+                formatted_value = f"{spec.get('value_prefix', '')}{format_value(current_value)}{spec.get('value_suffix', '')}"
+
+            # Deltas are only shown when a previous value was provided; one that can't be computed shows as N/A
+            delta_str: Optional[str] = None
+            delta_color: str = "off"
+            if has_previous[i]:
+                delta_str = deltas[i]
+                delta_color = delta_colors[i]
+                if delta_str is None:
+                    delta_color = "off"
+                    delta_str = "N/A"
+
+            if containers is not None:
+                if i and i % num_columns == 0:
+                    containers = st.columns(num_columns) # Start a new row
+                with containers[i % num_columns]:
+                    st.metric(label=label, value=formatted_value, delta=delta_str, delta_color=delta_color)
+            else:
+                st.metric(label=label, value=formatted_value, delta=delta_str, delta_color=delta_color)
+            logger.debug(f"Metric '{label}' displayed with value '{formatted_value}' and delta '{delta_str}'.")
+
+    @staticmethod
     def build_metric_card(
         label: str,
         current_value: Optional[Union[int, float]],
@@ -30,6 +99,7 @@ class MetricBuilder:
     ):
         """
         Builds and displays a Streamlit metric card with optional delta.
+        A single-card build_metric_grid, so both paths format and color values identically.
 
         Args:
             label (str): The label for the metric (e.g., "Total Credits Used").
@@ -44,44 +114,12 @@ class MetricBuilder:
             value_prefix (str): An additional string prefix to prepend to the formatted value.
             value_suffix (str): An additional string suffix to append to the formatted value.
         """
-        # Get formatting rules from config
-        format_config = METRIC_FORMATS.get(metric_type, METRIC_FORMATS["number"])
-        
-        prefix = value_prefix + format_config.get("prefix", "")
-        suffix = format_config.get("suffix", "") + value_suffix
-        decimals = format_config.get("decimals", 0)
-        thousands_sep = format_config.get("thousands_sep", False)
-
-        # Format current value
-        if current_value is None:
-            formatted_value = "N/A"
-            logger.debug(f"Metric '{label}': Current value is None.")
-        else:
-            if thousands_sep:
-                formatted_value = f"{current_value:,.{decimals}f}" # Format with comma separator
-            else:
-                formatted_value = f"{current_value:.{decimals}f}" # Format without comma separator
-            formatted_value = f"{prefix}{formatted_value}{suffix}"
-
-        # Calculate and format delta if previous_value is provided
-        delta_str: Optional[str] = None
-        delta_color: str = "off"
-
-        if previous_value is not None:
-            # Use DataProcessor for consistent delta calculation
-            delta_str = DataProcessor.calculate_percentage_delta(current_value, previous_value)
-            
-            # Use DataProcessor for consistent delta color determination
-            # Note: For costs, higher_is_better_for_delta would be False (lower cost is better)
-            delta_color = DataProcessor.determine_delta_color(
-                current_value, previous_value, higher_is_better=higher_is_better_for_delta
-            )
-            
-            # If current_value is None or previous_value is None, delta_str would be None
-            # In that case, we want delta_color to be 'off' and delta_str to indicate it.
-            if delta_str is None:
-                delta_color = "off"
-                delta_str = "N/A"
-        
-        st.metric(label=label, value=formatted_value, delta=delta_str, delta_color=delta_color)
-        logger.debug(f"Metric '{label}' displayed with value '{formatted_value}' and delta '{delta_str}'.")
\ No newline at end of file
+        MetricBuilder.build_metric_grid([{
+            "label": label,
+            "current_value": current_value,
+            "previous_value": previous_value,
+            "metric_type": metric_type,
+            "higher_is_better_for_delta": higher_is_better_for_delta,
+            "value_prefix": value_prefix,
+            "value_suffix": value_suffix,
+        }])
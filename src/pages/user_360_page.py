@@ -4,7 +4,9 @@ import streamlit as st
 from snowflake.snowpark import Session
 import pandas as pd
 import logging
-from typing import Dict, Any, Optional
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 
 # Import all necessary modules
 from src.utils import handle_errors
@@ -18,6 +20,25 @@ from src.config import PRIORITY_LEVELS # Needed for mapping priority labels to c
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=32)
+def _previous_period(start_date: str, end_date: str) -> Tuple[str, str]:
+    """
+    Returns the ('YYYY-MM-DD', 'YYYY-MM-DD') bounds of the period of the same length that ends at start_date.
+    Cached on the filter values, so reruns with unchanged dates don't recompute it.
+    """
+    start = date.fromisoformat(start_date)
+    period_duration = date.fromisoformat(end_date) - start
+    return (start - period_duration).isoformat(), start_date
+
+# Maps the PRIORITY_LEVEL strings returned by 'cost_by_user_priority' to PRIORITY_LEVELS keys
+# in config, matched on their core meaning; anything else is shown as "N/A".
+_QUERY_PRIORITY_TO_LEVEL: Dict[str, str] = {
+    'Critical Cost Risk 🔴': "High Priority",
+    'High Cost Exposure 🟠': "Medium Priority",
+    'Above Average Spend 🟡': "Medium Priority", # Could be "Above Avg Cost" depending on desired emphasis
+    'Optimized Usage 🟢': "Good Performance",
+}
+
 class User360Page:
     """
     Represents the 'User 360 Analysis' dashboard page,
@@ -25,6 +46,16 @@ class User360Page:
     the new set of SQL queries provided by the user.
     """
 
+    @staticmethod
+    def _rows_by_period(df: Optional[pd.DataFrame]) -> Dict[str, Dict[str, Any]]:
+        """
+        Pivots the output of a multi-period query (one row per 'PERIOD') into
+        {period: {column: value}} so each metric card can pick its values.
+        """
+        if df is None or df.empty or "PERIOD" not in df.columns:
+            return {}
+        return {row.pop("PERIOD"): row for row in df.to_dict("records")}
+
     @staticmethod
     @handle_errors
     def render(session: Session) -> None:
@@ -40,43 +71,31 @@ class User360Page:
         )
 
         # 1. Filters (Sidebar)
-        # We will still use a start_date filter, as all your queries depend on it.
-        # The end_date is kept for consistency but mainly affects previous period calculation
-        # and conceptual display, as your current queries run from start_date "onwards".
+        # Every time-bound query covers [start_date, end_date); end_date is exclusive
+        # (FilterManager returns the day after the selected end date).
         filter_params: Dict[str, Any] = FilterManager.get_time_and_user_filters(session)
         start_date: str = filter_params["start_date"]
-        # end_date is primarily for the filter component and previous period calculation
-        # The actual queries only use start_date for filtering.
         end_date: str = filter_params["end_date"]
         selected_user: Optional[str] = filter_params["user_name"]
-        user_filter_clause: str = filter_params["user_name_filter_clause"] # Matches your '{user_filter}'
 
-        if not start_date: # Only start_date is strictly required by your queries
+        if not start_date or not end_date:
             st.warning("Please select a valid start date to load data.", icon="⚠️")
             return # Stop execution if dates are not valid
 
         # Calculate previous period for delta comparison for relevant metrics
         # Assumes the previous period is the same duration *before* the start_date.
-        start_date_dt = pd.to_datetime(start_date)
-        # Using a fixed 30-day period for delta calculation if no end_date in query,
-        # or you can make this configurable. Here, end_date will be used to define the period.
-        period_duration = (pd.to_datetime(end_date) - start_date_dt)
-
-        prev_end_date_dt = start_date_dt
-        prev_start_date_dt = prev_end_date_dt - period_duration
-
-        prev_start_date: str = prev_start_date_dt.strftime("%Y-%m-%d")
-        prev_end_date: str = prev_end_date_dt.strftime("%Y-%m-%d")
-
+        prev_start_date, prev_end_date = _previous_period(start_date, end_date)
 
+        user_label = selected_user if selected_user else 'All Users'
+        last_day = (date.fromisoformat(end_date) - timedelta(days=1)).isoformat() # Inclusive end, for display
         st.info(
-            f"**Analysis Period:** From `{start_date}` (inclusive) "
-            f"| **User:** `{selected_user if selected_user else 'All Users'}`",
+            f"**Analysis Period:** `{start_date}` to `{last_day}` (inclusive) "
+            f"| **User:** `{user_label}`",
             icon="📊"
         )
         
-        st.write(f"Analyzing data from **{start_date}** onwards for user: **{selected_user if selected_user else 'All Users'}**.")
-        st.caption("Note: Your custom queries filter data from the selected start date up to the present (or last available data in ACCOUNT_USAGE).")
+        st.write(f"Analyzing data from **{start_date}** to **{last_day}** for user: **{user_label}**.")
+        st.caption("Note: All metrics cover the selected period; deltas compare it with the period of the same length just before it. ACCOUNT_USAGE data can lag by a few hours.")
 
         with st.container():
             st.markdown("---")
@@ -84,120 +103,123 @@ class User360Page:
             # 2. Key Performance Indicators (KPIs) - Using your query outputs
             UIElements.render_section_header("Core Performance Indicators", icon="📊")
 
-            col1, col2, col3, col4 = st.columns(4)
-            col5, col6, col7, col8 = st.columns(4) # For 8 KPIs
-
             # Prepare common query parameters for current and previous periods
+            # DataFetcher turns "user_name" into the '{user_filter}' clause with a bind parameter
             current_period_query_params = {
                 "start_date": start_date,
-                "user_filter": user_filter_clause # Match your placeholder name
+                "end_date": end_date,
+                "user_name": selected_user
             }
-            previous_period_query_params = {
-                "start_date": prev_start_date, # Use shifted start date for previous period
-                "user_filter": user_filter_clause
+            # For "*_both_periods" queries, which return one row per period ('current'/'previous')
+            both_periods_query_params = {
+                "start_date": start_date,
+                "end_date": end_date,
+                "prev_start_date": prev_start_date,
+                "prev_end_date": prev_end_date,
+                "user_name": selected_user
             }
             # For "total_users_defined" which is not time-bound, pass empty dict
             non_time_bound_params = {}
 
-            with st.spinner("Calculating core metrics..."):
-                # --- KPI 1: Total Queries Run ---
-                total_queries_run = DataFetcher.fetch_metric_value(session, "user_360_queries.total_queries_run", current_period_query_params)
-                prev_total_queries_run = DataFetcher.fetch_metric_value(session, "user_360_queries.total_queries_run", previous_period_query_params)
-                with col1:
-                    MetricBuilder.build_metric_card(
-                        label="Total Queries Run",
-                        current_value=total_queries_run,
-                        previous_value=prev_total_queries_run,
-                        metric_type="number",
-                        higher_is_better_for_delta=True
-                    )
-
-                # --- KPI 2: Total Active Users ---
-                total_active_users = DataFetcher.fetch_metric_value(session, "user_360_queries.total_active_users", current_period_query_params)
-                prev_total_active_users = DataFetcher.fetch_metric_value(session, "user_360_queries.total_active_users", previous_period_query_params)
-                with col2:
-                    MetricBuilder.build_metric_card(
-                        label="Total Active Users",
-                        current_value=total_active_users,
-                        previous_value=prev_total_active_users,
-                        metric_type="number",
-                        higher_is_better_for_delta=True
-                    )
-
-                # --- KPI 3: Avg Cost Per User ---
-                avg_cost_per_user = DataFetcher.fetch_metric_value(session, "user_360_queries.avg_cost_per_user", current_period_query_params)
-                prev_avg_cost_per_user = DataFetcher.fetch_metric_value(session, "user_360_queries.avg_cost_per_user", previous_period_query_params)
-                with col3:
-                    MetricBuilder.build_metric_card(
-                        label="Avg Cost Per User",
-                        current_value=avg_cost_per_user,
-                        previous_value=prev_avg_cost_per_user,
-                        metric_type="currency",
-                        higher_is_better_for_delta=False
-                    )
-
-                # --- KPI 4: Avg Query Duration (Seconds) ---
-                avg_query_duration = DataFetcher.fetch_metric_value(session, "user_360_queries.avg_query_duration", current_period_query_params)
-                prev_avg_query_duration = DataFetcher.fetch_metric_value(session, "user_360_queries.avg_query_duration", previous_period_query_params)
-                with col4:
-                    MetricBuilder.build_metric_card(
-                        label="Avg Query Duration",
-                        current_value=avg_query_duration,
-                        previous_value=prev_avg_query_duration,
-                        metric_type="duration_seconds",
-                        higher_is_better_for_delta=False
-                    )
-
-                # --- KPI 5: Total Users Defined (Not time-bound) ---
-                total_users_defined = DataFetcher.fetch_metric_value(session, "user_360_queries.total_users_defined", non_time_bound_params)
-                # No previous value for non-time-bound metrics unless explicitly queried differently
-                with col5:
-                    MetricBuilder.build_metric_card(
-                        label="Total Users Defined",
-                        current_value=total_users_defined,
-                        metric_type="number"
-                    )
+            # The section queries below don't depend on the KPIs or on each other: start them now so
+            # they run on the warehouse while the KPI cards render, and wait on each where it's drawn.
+            section_futures = DataFetcher.submit_many(session, {
+                "cost_by_user_role": ("user_360.cost_by_user_and_role", current_period_query_params),
+                "user_priority": ("user_360.cost_by_user_priority", current_period_query_params),
+                "bottlenecks": ("user_360.query_performance_bottlenecks", current_period_query_params),
+                "user_behavior": ("user_360.user_behavior_hourly_matrix", current_period_query_params),
+                "optim_opportunities": ("user_360.optimization_opportunities", current_period_query_params),
+            })
 
-                # --- KPI 6: Percentage High Cost Users ---
-                percentage_high_cost_users = DataFetcher.fetch_metric_value(session, "user_360_queries.percentage_high_cost_users", current_period_query_params)
-                # For this one, no previous period delta is directly calculated in your query.
-                # If you need a delta, you'd need a separate query for prev period.
-                with col6:
-                    MetricBuilder.build_metric_card(
-                        label="% High Cost Users",
-                        current_value=percentage_high_cost_users,
-                        metric_type="percentage",
-                        higher_is_better_for_delta=False
-                    )
-                
-                # --- KPI 7: High Cost Users Count ---
-                high_cost_users_count = DataFetcher.fetch_metric_value(session, "user_360_queries.high_cost_users_count", current_period_query_params)
-                # Similar to above, no direct prev period delta from your query.
-                with col7:
-                    MetricBuilder.build_metric_card(
-                        label="High Cost Users Count",
-                        current_value=high_cost_users_count,
-                        metric_type="number",
-                        higher_is_better_for_delta=False
-                    )
-
-                # --- KPI 8: Failed Queries Percentage ---
-                failed_queries_percentage = DataFetcher.fetch_metric_value(session, "user_360_queries.failed_queries_percentage", current_period_query_params)
-                # Similar to above, no direct prev period delta from your query.
-                with col8:
-                    MetricBuilder.build_metric_card(
-                        label="Failed Queries %",
-                        current_value=failed_queries_percentage,
-                        metric_type="percentage",
-                        higher_is_better_for_delta=False
-                    )
+            with st.spinner("Calculating core metrics..."):
+                # The KPI queries are independent of each other, so submit them all at once
+                kpi_results = DataFetcher.fetch_many(session, {
+                    "kpi_bundle": ("user_360.user_360_kpi_bundle", both_periods_query_params),
+                    "avg_cost": ("user_360.avg_cost_per_user_both_periods", both_periods_query_params),
+                    "total_users_defined": ("user_360.total_users_defined", non_time_bound_params),
+                    "percentage_high_cost_users": ("user_360.percentage_high_cost_users", current_period_query_params),
+                    "high_cost_users_count": ("user_360.high_cost_users_count", current_period_query_params),
+                }, metric_names={"total_users_defined", "percentage_high_cost_users", "high_cost_users_count"})
+
+                # KPIs 1, 2, 4 and 8 come from a single scan of query history covering both periods
+                kpis = User360Page._rows_by_period(kpi_results["kpi_bundle"])
+                current_kpis = kpis.get("current", {})
+                previous_kpis = kpis.get("previous", {})
+
+                # KPI 3 comes back as one row per period from a single query; pivot the two rows client-side
+                avg_cost_by_period = User360Page._rows_by_period(kpi_results["avg_cost"])
+
+                # All eight cards in one batch (two rows of four), so deltas and colors are computed together
+                MetricBuilder.build_metric_grid([
+                    # --- KPI 1: Total Queries Run ---
+                    {
+                        "label": "Total Queries Run",
+                        "current_value": current_kpis.get("TOTAL_QUERIES_RUN"),
+                        "previous_value": previous_kpis.get("TOTAL_QUERIES_RUN"),
+                        "metric_type": "number",
+                        "higher_is_better_for_delta": True,
+                    },
+                    # --- KPI 2: Total Active Users ---
+                    {
+                        "label": "Total Active Users",
+                        "current_value": current_kpis.get("TOTAL_ACTIVE_USERS"),
+                        "previous_value": previous_kpis.get("TOTAL_ACTIVE_USERS"),
+                        "metric_type": "number",
+                        "higher_is_better_for_delta": True,
+                    },
+                    # --- KPI 3: Avg Cost Per User ---
+                    {
+                        "label": "Avg Cost Per User",
+                        "current_value": avg_cost_by_period.get("current", {}).get("METRIC_VALUE"),
+                        "previous_value": avg_cost_by_period.get("previous", {}).get("METRIC_VALUE"),
+                        "metric_type": "currency",
+                        "higher_is_better_for_delta": False,
+                    },
+                    # --- KPI 4: Avg Query Duration (Seconds) ---
+                    {
+                        "label": "Avg Query Duration",
+                        "current_value": current_kpis.get("AVG_QUERY_DURATION"),
+                        "previous_value": previous_kpis.get("AVG_QUERY_DURATION"),
+                        "metric_type": "duration_seconds",
+                        "higher_is_better_for_delta": False,
+                    },
+                    # --- KPI 5: Total Users Defined (Not time-bound, so no previous value) ---
+                    {
+                        "label": "Total Users Defined",
+                        "current_value": kpi_results["total_users_defined"],
+                        "metric_type": "number",
+                    },
+                    # --- KPI 6: Percentage High Cost Users (current period only, no delta) ---
+                    {
+                        "label": "% High Cost Users",
+                        "current_value": kpi_results["percentage_high_cost_users"],
+                        "metric_type": "percentage",
+                        "higher_is_better_for_delta": False,
+                    },
+                    # --- KPI 7: High Cost Users Count (current period only, no delta) ---
+                    {
+                        "label": "High Cost Users Count",
+                        "current_value": kpi_results["high_cost_users_count"],
+                        "metric_type": "number",
+                        "higher_is_better_for_delta": False,
+                    },
+                    # --- KPI 8: Failed Queries Percentage ---
+                    # The KPI bundle already covers the previous period, so this card gets a delta for free.
+                    {
+                        "label": "Failed Queries %",
+                        "current_value": current_kpis.get("FAILED_QUERIES_PERCENTAGE"),
+                        "previous_value": previous_kpis.get("FAILED_QUERIES_PERCENTAGE"),
+                        "metric_type": "percentage",
+                        "higher_is_better_for_delta": False,
+                    },
+                ], num_columns=4)
 
             st.markdown("---")
 
             # 3. Cost by User and Role (Top N visualization)
             UIElements.render_section_header("Top Costs by User & Role", icon="💰", description="Top 10 users and roles by cost in USD.")
             with st.spinner("Fetching cost by user and role..."):
-                cost_by_user_role_df = DataFetcher.fetch_data(session, "user_360_queries.cost_by_user_and_role", current_period_query_params)
+                cost_by_user_role_df = section_futures["cost_by_user_role"].result()
 
                 if cost_by_user_role_df is not None and not cost_by_user_role_df.empty:
                     # Your query already returns 'name', 'cost_usd', 'type'.
@@ -225,31 +247,23 @@ class User360Page:
             with col_priority:
                 UIElements.render_section_header("User Cost Priority", icon="🚨", description="Users categorized by their cost risk based on average spend.")
                 with st.spinner("Analyzing user cost priorities..."):
-                    # This fetches data using the 'cost_by_user_priority' query.
-                    user_priority_df = DataFetcher.fetch_data(session, "user_360_queries.cost_by_user_priority", current_period_query_params)
+                    # Result of the 'cost_by_user_priority' query submitted above.
+                    user_priority_df = section_futures["user_priority"].result()
 
                     if user_priority_df is not None and not user_priority_df.empty:
                         # Display alerts for high-priority users
-                        # Your query provides 'PRIORITY_LEVEL' directly. Map it to our config.
-                        for _, row in user_priority_df.iterrows():
-                            # Map query's string to PRIORITY_LEVELS keys (or default)
-                            # Assuming your query output 'Critical Cost Risk 🔴', 'High Cost Exposure 🟠', etc.
-                            # We need to map these to actual keys in PRIORITY_LEVELS if they don't match exactly.
-                            # Or update PRIORITY_LEVELS to include these exact strings.
-                            # For simplicity, let's try to match based on the core meaning.
-                            priority_key_mapping = {
-                                'Critical Cost Risk 🔴': "High Priority",
-                                'High Cost Exposure 🟠': "Medium Priority",
-                                'Above Average Spend 🟡': "Medium Priority", # Could be 'Low Priority' depending on desired emphasis
-                                'Optimized Usage 🟢': "Normal"
-                            }
-                            mapped_key = priority_key_mapping.get(row['PRIORITY_LEVEL'], "N/A")
-
-                            UIElements.render_priority_alert(
-                                mapped_key,
-                                f"User: {row['USER_NAME']} | Cost: ${row['TOTAL_COST_USD']:.2f}",
-                                f"Queries: {row['QUERY_COUNT']}, Avg Duration: {row['AVG_DURATION_SEC']:.2f}s, Failed: {row['FAILED_QUERIES']}. Status: {row['PRIORITY_LEVEL']}"
+                        # Your query provides 'PRIORITY_LEVEL' directly; map it to our config.
+                        # itertuples yields plain tuples rather than boxing every row into a Series.
+                        alerts = [
+                            (
+                                _QUERY_PRIORITY_TO_LEVEL.get(row.PRIORITY_LEVEL, "N/A"),
+                                f"User: {row.USER_NAME} | Cost: ${row.TOTAL_COST_USD:.2f}<br>"
+                                f"Queries: {row.QUERY_COUNT}, Avg Duration: {row.AVG_DURATION_SEC:.2f}s, Failed: {row.FAILED_QUERIES}. Status: {row.PRIORITY_LEVEL}"
                             )
+                            for row in user_priority_df.itertuples(index=False)
+                        ]
+                        for mapped_key, message in alerts:
+                            UIElements.render_priority_alert(mapped_key, message)
                         
                         st.markdown("---")
                         st.subheader("Detailed User Cost Breakdown")
@@ -264,8 +278,8 @@ class User360Page:
             with col_bottleneck:
                 UIElements.render_section_header("Query Performance Bottlenecks", icon="🐢", description="Identifies queries that are slow, failing, or inefficient and suggests actions.")
                 with st.spinner("Analyzing query performance bottlenecks..."):
-                    # This fetches data using the 'query_performance_bottlenecks' query.
-                    bottleneck_df = DataFetcher.fetch_data(session, "user_360_queries.query_performance_bottlenecks", current_period_query_params)
+                    # Result of the 'query_performance_bottlenecks' query submitted above.
+                    bottleneck_df = section_futures["bottlenecks"].result()
 
                     if bottleneck_df is not None and not bottleneck_df.empty:
                         # Display the DataFrame as an interactive table
@@ -283,39 +297,25 @@ class User360Page:
             UIElements.render_section_header("User Behavior Patterns", icon="🚶", description="Hourly query activity and average duration for top users.")
 
             with st.spinner("Analyzing user behavior patterns..."):
-                # This fetches data using the 'user_behavior_patterns' query.
-                user_behavior_df = DataFetcher.fetch_data(session, "user_360_queries.user_behavior_patterns", current_period_query_params)
+                # Snowflake returns the data already pivoted: one row per user, one column per hour and measure.
+                user_behavior_df = section_futures["user_behavior"].result()
 
                 if user_behavior_df is not None and not user_behavior_df.empty:
-                    # Pivot data for heatmap: User vs. Hour for Total Queries
-                    pivot_queries_df = user_behavior_df.pivot_table(
-                        index='USER_NAME',
-                        columns='HOUR_OF_DAY',
-                        values='TOTAL_QUERIES',
-                        fill_value=0 # Fill hours with no queries as 0
-                    )
-                    # Ensure all 24 hours are columns, even if no data for some
                     all_hours = list(range(24))
-                    pivot_queries_df = pivot_queries_df.reindex(columns=all_hours, fill_value=0)
-
-                    # Pivot data for heatmap: User vs. Hour for Avg Duration
-                    pivot_duration_df = user_behavior_df.pivot_table(
-                        index='USER_NAME',
-                        columns='HOUR_OF_DAY',
-                        values='AVG_DURATION_SEC',
-                        fill_value=0 # Fill hours with no queries as 0 duration
-                    )
-                    pivot_duration_df = pivot_duration_df.reindex(columns=all_hours, fill_value=0)
-
+                    user_names = user_behavior_df['USER_NAME'].tolist()
+                    # Hand the hour columns to the heatmaps as plain arrays; no pivoted DataFrames needed.
+                    # User vs. Hour for Total Queries
+                    queries_z = user_behavior_df[[f"QUERIES_H{hour:02d}" for hour in all_hours]].to_numpy(dtype="float32")
+                    # User vs. Hour for Avg Duration
+                    duration_z = user_behavior_df[[f"AVG_DURATION_SEC_H{hour:02d}" for hour in all_hours]].to_numpy(dtype="float32")
 
                     col_heatmap_queries, col_heatmap_duration = st.columns(2)
 
                     with col_heatmap_queries:
                         queries_heatmap_fig = ChartBuilder.build_heatmap(
-                            df=user_behavior_df, # original df for consistency, z_data is the pivot
-                            x_labels=pivot_queries_df.columns.tolist(),
-                            y_labels=pivot_queries_df.index.tolist(),
-                            z_data=pivot_queries_df,
+                            x_labels=all_hours,
+                            y_labels=user_names,
+                            z_data=queries_z,
                             title="Total Queries by User and Hour",
                             x_axis_title="Hour of Day",
                             y_axis_title="User Name",
@@ -327,10 +327,9 @@ class User360Page:
 
                     with col_heatmap_duration:
                         duration_heatmap_fig = ChartBuilder.build_heatmap(
-                            df=user_behavior_df, # original df for consistency, z_data is the pivot
-                            x_labels=pivot_duration_df.columns.tolist(),
-                            y_labels=pivot_duration_df.index.tolist(),
-                            z_data=pivot_duration_df,
+                            x_labels=all_hours,
+                            y_labels=user_names,
+                            z_data=duration_z,
                             title="Avg Query Duration (s) by User and Hour",
                             x_axis_title="Hour of Day",
                             y_axis_title="User Name",
@@ -348,8 +347,8 @@ class User360Page:
             UIElements.render_section_header("Identified Optimization Opportunities", icon="💡", description="Actionable insights for cost reduction and performance improvement.")
 
             with st.spinner("Identifying optimization opportunities..."):
-                # This fetches data using the 'optimization_opportunities' query.
-                optim_opportunities_df = DataFetcher.fetch_data(session, "user_360_queries.optimization_opportunities", current_period_query_params)
+                # Result of the 'optimization_opportunities' query submitted above.
+                optim_opportunities_df = section_futures["optim_opportunities"].result()
 
                 if optim_opportunities_df is not None and not optim_opportunities_df.empty:
                     # Display the DataFrame as an interactive table
@@ -1,15 +1,19 @@
 # finops_dashboard/src/ui_elements.py
 
+import re
 import streamlit as st
 import logging
 from typing import Optional
 
-# Import utilities and configuration
-from src.utils import handle_errors
+# Import configuration
 from src.config import APP_TITLE, APP_DESCRIPTION, APP_ICON, GLOBAL_CSS, PRIMARY_COLOR, INFO_COLOR, PRIORITY_LEVELS
 
 logger = logging.getLogger(__name__)
 
+# GLOBAL_CSS with comments and indentation stripped, computed once at import. The style block has to
+# be re-sent on every rerun (elements not emitted in a run are removed from the page), so keep it small.
+_GLOBAL_CSS_MINIFIED = re.sub(r"\s+", " ", re.sub(r"/\*.*?\*/", "", GLOBAL_CSS, flags=re.DOTALL)).strip()
+
 class UIElements:
     """
     Provides reusable Streamlit UI components with custom styling.
@@ -39,14 +43,13 @@ class UIElements:
         This must be called at the start of the app (after set_page_config).
         """
         try:
-            st.markdown(GLOBAL_CSS, unsafe_allow_html=True)
+            st.markdown(_GLOBAL_CSS_MINIFIED, unsafe_allow_html=True)
             logger.debug("Global CSS styles injected.")
         except Exception as e:
             logger.error(f"Failed to inject global CSS styles: {e}", exc_info=True)
 
 
     @staticmethod
-    @handle_errors
     def render_page_header(title: str, description: str):
         """
         Renders a large, stylized header for a main dashboard page.
@@ -64,7 +67,6 @@ class UIElements:
         logger.debug(f"Page header '{title}' rendered.")
 
     @staticmethod
-    @handle_errors
     def render_section_header(title: str, icon: Optional[str] = None, description: Optional[str] = None):
         """
         Renders a smaller, stylized header for a section within a page.
@@ -83,7 +85,6 @@ class UIElements:
         logger.debug(f"Section header '{title}' rendered.")
 
     @staticmethod
-    @handle_errors
     def render_info_card(header: str, content: str, icon: str = "ℹ️"):
         """
         Renders a custom-styled information card.
@@ -105,7 +106,6 @@ class UIElements:
         logger.debug(f"Info card '{header}' rendered.")
 
     @staticmethod
-    @handle_errors
     def render_priority_alert(priority_level: str, message: str):
         """
         Renders a custom-styled alert box based on a defined priority level.
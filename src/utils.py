@@ -2,8 +2,8 @@
 
 import logging
 import streamlit as st
-from typing import Any, Callable, TypeVar, ParamSpec
-from functools import wraps
+from typing import Any, Callable, Optional, TypeVar, ParamSpec
+from functools import lru_cache, wraps
 import os # For checking if in Snowflake env
 
 # Type variables for better type hinting with decorators
@@ -34,10 +34,12 @@ def init_logging():
         logger.debug("Global logging already initialized.")
 
 
+@lru_cache(maxsize=1)
 def is_running_in_snowflake_env() -> bool:
     """
     Checks if the application is running within a Snowflake environment (e.g., Snowpark Streamlit app).
     This helps in adapting behavior, like session retrieval.
+    The environment can't change while the process is running, so the result is computed once.
     """
     # This is a common heuristic. Snowflake might set specific environment variables.
     # SNOWFLAKE_WAREHOUSE and SNOWFLAKE_DATABASE are often set in a native app environment.